@@ -0,0 +1,122 @@
+"""Pooled HTTP client for the USDA AWDB REST API"""
+
+import threading
+from urllib.parse import quote, urlencode
+
+import polars as pl
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from snow_pipeline import iter_weather_batches, read_weather_data
+from snow_store import empty_observations
+
+AWDB_DATA_URL = "https://wcc.sc.egov.usda.gov/awdbRestApi/services/v1/data"
+
+# Transient server errors worth retrying
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class AWDBClient:
+    """Keep-alive, retrying AWDB client with conditional GET support.
+
+    One pooled requests.Session is shared by all callers (and threads).
+    Connection errors, timeouts and 5xx responses are retried with
+    exponential backoff plus jitter. The ETag/Last-Modified validators of the
+    last response per station are replayed, so an unchanged body costs a 304
+    and the previously parsed frame is returned instead.
+    """
+
+    def __init__(self, max_connections=4, retries=4, backoff_factor=0.5, timeout=30):
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_maxsize=max_connections, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip"
+        self.timeout = timeout
+
+        # station triplet -> (url, validator headers, parsed observations)
+        self._conditional_cache = {}
+        self._lock = threading.Lock()
+
+    def data_url(
+        self, station_triplet, elements, begin_date, duration="HOURLY", end_date=None
+    ):
+        """URL of the AWDB data endpoint for one station"""
+        params = {
+            "stationTriplets": station_triplet,
+            "elements": ",".join(elements),
+            "duration": duration,
+            "beginDate": str(begin_date)[:16],
+            "returnFlags": "false",
+            "returnOriginalValues": "false",
+            "returnSuspectData": "false",
+        }
+        if end_date is not None:
+            params["endDate"] = str(end_date)[:16]
+        return f"{AWDB_DATA_URL}?{urlencode(params, quote_via=quote)}"
+
+    def get_data(
+        self,
+        station_triplet,
+        elements,
+        begin_date,
+        duration="HOURLY",
+        stream=False,
+        end_date=None,
+    ):
+        """Fetch observations for one station as a long-format frame.
+
+        The range runs through end_date, or the newest report when it is None.
+        With stream=True the body is parsed incrementally into batches instead
+        of being held in memory whole, which keeps large backfills from spiking.
+        Raises requests exceptions on transport/HTTP errors and ValueError on a
+        malformed body.
+        """
+        url = self.data_url(station_triplet, elements, begin_date, duration, end_date)
+
+        headers = {}
+        with self._lock:
+            cached = self._conditional_cache.get(station_triplet)
+        if cached is not None and cached[0] == url:
+            headers = cached[1]
+
+        with self.session.get(
+            url, headers=headers, timeout=self.timeout, stream=stream
+        ) as response:
+            if response.status_code == 304:
+                return cached[2]
+            response.raise_for_status()
+
+            if stream:
+                response.raw.decode_content = True
+                batches = list(iter_weather_batches(response.raw))
+                observations = pl.concat(batches) if batches else empty_observations()
+            else:
+                observations = read_weather_data(response.content)
+
+            validators = {}
+            if "ETag" in response.headers:
+                validators["If-None-Match"] = response.headers["ETag"]
+            if "Last-Modified" in response.headers:
+                validators["If-Modified-Since"] = response.headers["Last-Modified"]
+
+        if validators:
+            with self._lock:
+                self._conditional_cache[station_triplet] = (
+                    url,
+                    validators,
+                    observations,
+                )
+        return observations
@@ -0,0 +1,95 @@
+"""Benchmark AWDB response ingestion: dict loop vs native and streaming readers.
+
+Usage:
+    python benchmarks/bench_ingest.py --seasons 3 --repeat 5
+"""
+
+import argparse
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from snow_pipeline import iter_weather_batches, read_weather_data  # noqa: E402
+from snow_store import OBSERVATION_SCHEMA  # noqa: E402
+from synthetic import synthetic_payload  # noqa: E402
+
+
+def legacy_ingest(raw_json):
+    """Previous ingestion: json.loads plus one dict per hourly reading"""
+    weather_data_list = []
+    for station in json.loads(raw_json):
+        station_triplet = station["stationTriplet"]
+        for measurement in station["data"]:
+            element_code = measurement["stationElement"]["elementCode"]
+            for val in measurement["values"]:
+                weather_data_list.append(
+                    {
+                        "stationTriplet": station_triplet,
+                        "elementCode": element_code,
+                        "date": val["date"],
+                        "value": val["value"],
+                    }
+                )
+    return pl.DataFrame(weather_data_list).with_columns(
+        pl.col("date").str.strptime(pl.Datetime("us"), "%Y-%m-%d %H:%M")
+    )
+
+
+def streaming_ingest(raw_json):
+    """Incremental ijson parse into batches, concatenated at the end"""
+    return pl.concat(list(iter_weather_batches(io.BytesIO(raw_json))))
+
+
+def measure(func, raw_json, repeat):
+    """Best wall time over `repeat` runs and peak Python heap of one traced run"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(raw_json)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(raw_json)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, min(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    raw_json = synthetic_payload(hours=args.seasons * 365 * 24)
+    print(f"Payload: {args.seasons} seasons, {len(raw_json) / 1e6:.1f} MB")
+
+    legacy_df, legacy_time, legacy_peak = measure(legacy_ingest, raw_json, args.repeat)
+    native_df, native_time, native_peak = measure(
+        read_weather_data, raw_json, args.repeat
+    )
+    stream_df, stream_time, stream_peak = measure(
+        streaming_ingest, raw_json, args.repeat
+    )
+    assert native_df.equals(legacy_df.cast(OBSERVATION_SCHEMA))
+    assert stream_df.equals(native_df)
+
+    print(f"{'':<12}{'rows':>10}{'time (ms)':>12}{'py heap (MB)':>15}")
+    for name, df, elapsed, peak in [
+        ("dict loop", legacy_df, legacy_time, legacy_peak),
+        ("read_json", native_df, native_time, native_peak),
+        ("ijson", stream_df, stream_time, stream_peak),
+    ]:
+        print(f"{name:<12}{df.height:>10}{elapsed * 1000:>12.1f}{peak / 1e6:>15.1f}")
+    print(f"read_json speedup over dict loop: {legacy_time / native_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark the in-memory size of the cached frames.
+
+Each frame the refresher keeps resident (plus the long-format observation
+history built during a refresh) is measured in the compact storage schema
+and in the layout it had before: Float64 readings and Categorical station
+and element codes. The original hourly frame also pivoted every fetched
+element and kept its two intermediate delta columns; both are rebuilt here
+so the comparison is against what was actually cached.
+
+Usage:
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --stations 12 --seasons 3
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from snow_pipeline import (  # noqa: E402
+    ROLLUP_PERIODS,
+    TimeRangeIndex,
+    build_heatmap_matrix,
+    build_latest_index,
+    build_rollup,
+    process_weather_data,
+    read_weather_data,
+    weather_data_plan,
+)
+from synthetic import ELEMENTS, synthetic_payload  # noqa: E402
+
+
+def original_layout(df):
+    """The same frame with Float64 readings and Categorical element codes"""
+    return df.with_columns(
+        pl.col(pl.Float32).cast(pl.Float64),
+        pl.col(pl.Enum).cast(pl.Categorical),
+    )
+
+
+def original_hourly(observations):
+    """The hourly frame as first cached: every element plus the delta columns"""
+    return (
+        weather_data_plan(observations, ELEMENTS)
+        .with_columns(
+            pl.col("SNWD").diff(1).over("stationTriplet").alias("delta_SNWD"),
+            pl.col("WTEQ").diff(1).over("stationTriplet").alias("delta_WTEQ"),
+        )
+        .collect()
+    )
+
+
+def cached_frames(raw_json):
+    """Observations plus every frame of a refresher snapshot, by name"""
+    observations = read_weather_data(raw_json)
+    hourly = process_weather_data(observations)
+    frames = {
+        "observations": observations,
+        "hourly": hourly,
+        "latest": build_latest_index(observations),
+        "heatmap": build_heatmap_matrix(TimeRangeIndex(hourly)),
+    }
+    for kind, every in ROLLUP_PERIODS.items():
+        frames[kind] = build_rollup(hourly, every)
+    return frames
+
+
+def original_frames(frames):
+    """The frames from cached_frames() in the layout they had before"""
+    original = dict(frames, hourly=original_hourly(frames["observations"]))
+    return {name: original_layout(frame) for name, frame in original.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=12)
+    parser.add_argument("--seasons", type=int, default=1)
+    args = parser.parse_args()
+
+    raw_json = synthetic_payload(stations=args.stations, hours=args.seasons * 365 * 24)
+    frames = cached_frames(raw_json)
+    before_frames = original_frames(frames)
+    print(f"{args.stations} stations, {args.seasons} seasons")
+
+    print(
+        f"{'frame':<14}{'rows':>10}{'before (MB)':>13}{'compact (MB)':>15}{'ratio':>8}"
+    )
+    snapshot_before = snapshot_compact = 0
+    for name, frame in frames.items():
+        before = before_frames[name].estimated_size()
+        compact = frame.estimated_size()
+        if name != "observations":
+            snapshot_before += before
+            snapshot_compact += compact
+        print(
+            f"{name:<14}{frame.height:>10}{before / 1e6:>13.2f}"
+            f"{compact / 1e6:>15.2f}{before / compact:>7.2f}x"
+        )
+    print(
+        f"{'snapshot':<14}{'':>10}{snapshot_before / 1e6:>13.2f}"
+        f"{snapshot_compact / 1e6:>15.2f}{snapshot_before / snapshot_compact:>7.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
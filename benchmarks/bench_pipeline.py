@@ -0,0 +1,274 @@
+"""Benchmark the dashboard data pipeline stage by stage.
+
+Scenarios are deterministic synthetic AWDB payloads (see synthetic.py) plus
+any recorded responses saved under benchmarks/fixtures/ (*.json or
+*.json.gz). No recordings are committed, so only the synthetic scenarios
+run until one is saved with --record-live. For each stage the best wall
+time, peak RSS growth and peak Python allocations are reported.
+
+Save a baseline on a known-good tree, then --check exits non-zero when any
+stage is slower than its baseline by more than --threshold. Only wall time
+is gated; RSS and allocation figures are reported but never checked.
+Baselines are machine specific and are not committed.
+
+Usage:
+    python benchmarks/bench_pipeline.py --save-baseline
+    python benchmarks/bench_pipeline.py --check --threshold 0.25
+    python benchmarks/bench_pipeline.py --record-live 784:CA:SNTL
+    python benchmarks/bench_pipeline.py --explain
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+import polars as pl
+import psutil
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from snow_pipeline import (  # noqa: E402
+    TimeRangeIndex,
+    build_heatmap_matrix,
+    build_latest_index,
+    build_rollup,
+    get_day_over_day_changes,
+    get_latest_metrics,
+    process_weather_data,
+    process_weather_data_with_qc,
+    read_weather_data,
+    update_heatmap_matrix,
+    weather_data_plan,
+)
+from synthetic import ELEMENTS, synthetic_payload  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+FIXTURE_DIR = BENCH_DIR / "fixtures"
+BASELINE_PATH = BENCH_DIR / ".baseline.json"
+
+SCENARIOS = {
+    "1 station, 1 season": dict(stations=1, hours=365 * 24),
+    "1 station, 5 seasons": dict(stations=1, hours=5 * 365 * 24),
+    "12 stations, 1 season": dict(stations=12, hours=365 * 24),
+}
+
+
+# (stage name, function of the shared state dict, output key); each stage
+# reads the outputs of earlier ones.
+STAGES = [
+    ("read_weather_data", lambda s: read_weather_data(s["raw"]), "observations"),
+    (
+        "process_weather_data",
+        lambda s: process_weather_data(s["observations"]),
+        "hourly",
+    ),
+    (
+        "process_weather_data_with_qc",
+        lambda s: process_weather_data_with_qc(s["observations"]),
+        None,
+    ),
+    ("build_rollup (daily)", lambda s: build_rollup(s["hourly"], "1d"), "daily"),
+    ("build_latest_index", lambda s: build_latest_index(s["observations"]), "latest"),
+    (
+        "TimeRangeIndex",
+        lambda s: {kind: TimeRangeIndex(s[kind]) for kind in ["hourly", "daily"]},
+        "index",
+    ),
+    (
+        "build_heatmap_matrix",
+        lambda s: build_heatmap_matrix(s["index"]["hourly"]),
+        "heatmap",
+    ),
+    (
+        "update_heatmap_matrix (1h)",
+        lambda s: update_heatmap_matrix(
+            s["heatmap"], s["index"]["hourly"], s["hourly"].get_column("date").max()
+        ),
+        None,
+    ),
+    (
+        "get_latest_metrics",
+        lambda s: get_latest_metrics(s["latest"], s["station"]),
+        None,
+    ),
+    (
+        "get_day_over_day_changes",
+        lambda s: get_day_over_day_changes(s, s["station"]),
+        None,
+    ),
+]
+
+
+def peak_rss_growth(func, arg):
+    """Run func(arg) while sampling RSS; returns (result, peak growth in bytes)"""
+    process = psutil.Process()
+    start_rss = process.memory_info().rss
+    peak_rss = start_rss
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak_rss
+        while not done.is_set():
+            peak_rss = max(peak_rss, process.memory_info().rss)
+            time.sleep(0.001)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        result = func(arg)
+    finally:
+        done.set()
+        sampler.join()
+    return result, max(peak_rss, process.memory_info().rss) - start_rss
+
+
+def run_scenario(raw_json, repeat):
+    """Time every stage on one payload; returns {stage: measurements}"""
+    state = {"raw": raw_json}
+    results = {}
+    for name, func, output_key in STAGES:
+        arg = state
+        output, rss_growth = peak_rss_growth(func, arg)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(arg)
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        func(arg)
+        _, alloc_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if output_key:
+            state[output_key] = output
+        if output_key == "observations":
+            state["station"] = output.item(0, "stationTriplet")
+        results[name] = {
+            "seconds": min(timings),
+            "rss_bytes": rss_growth,
+            "alloc_bytes": alloc_peak,
+        }
+    return results
+
+
+def load_fixtures():
+    """Recorded AWDB responses from FIXTURE_DIR, by file name"""
+    fixtures = {}
+    for path in sorted(FIXTURE_DIR.glob("*.json*")):
+        data = path.read_bytes()
+        fixtures[path.name] = gzip.decompress(data) if path.suffix == ".gz" else data
+    return fixtures
+
+
+def record_live(station_triplet, begin_date):
+    """Save a live AWDB response as a gzipped fixture"""
+    from awdb_client import AWDBClient
+
+    client = AWDBClient()
+    response = client.session.get(
+        client.data_url(station_triplet, ELEMENTS, begin_date),
+        timeout=client.timeout,
+    )
+    response.raise_for_status()
+
+    FIXTURE_DIR.mkdir(exist_ok=True)
+    path = FIXTURE_DIR / f"{station_triplet.replace(':', '_')}_{begin_date}.json.gz"
+    path.write_bytes(gzip.compress(response.content))
+    print(f"Recorded {len(response.content) / 1e6:.1f} MB to {path}")
+
+
+def explain_plan(raw_json):
+    """Print the optimized process_weather_data plan and a per-node profile"""
+    plan = weather_data_plan(read_weather_data(raw_json))
+    print("Optimized plan:")
+    print(plan.explain())
+
+    _, profile = plan.profile()
+    print("\nProfile (microseconds per node):")
+    with pl.Config(tbl_rows=-1, fmt_str_lengths=80):
+        print(profile.with_columns((pl.col("end") - pl.col("start")).alias("took")))
+
+
+def check_regressions(results, baseline, threshold):
+    """Stages slower than baseline by more than threshold, as message lines.
+
+    Only wall time is compared; memory figures are informational.
+    """
+    regressions = []
+    for scenario, stages in results.items():
+        for stage, measured in stages.items():
+            reference = baseline.get(scenario, {}).get(stage)
+            if reference is None:
+                continue
+            ratio = measured["seconds"] / reference["seconds"]
+            if ratio > 1 + threshold:
+                regressions.append(
+                    f"{scenario} / {stage}: {reference['seconds'] * 1000:.1f} ms"
+                    f" -> {measured['seconds'] * 1000:.1f} ms ({ratio:.2f}x)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--record-live", metavar="STATION_TRIPLET")
+    parser.add_argument("--begin-date", default="2025-10-01")
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="print the process_weather_data query plan and profile, then exit",
+    )
+    args = parser.parse_args()
+
+    if args.record_live:
+        record_live(args.record_live, args.begin_date)
+        return
+    if args.explain:
+        explain_plan(synthetic_payload(**next(iter(SCENARIOS.values()))))
+        return
+    if args.check and not args.baseline.exists():
+        sys.exit(f"No baseline at {args.baseline}; run with --save-baseline first")
+
+    payloads = {name: synthetic_payload(**params) for name, params in SCENARIOS.items()}
+    payloads.update(load_fixtures())
+
+    results = {}
+    for scenario, raw_json in payloads.items():
+        results[scenario] = run_scenario(raw_json, args.repeat)
+
+        print(f"\n{scenario} ({len(raw_json) / 1e6:.1f} MB)")
+        print(f"{'stage':<28}{'time (ms)':>12}{'rss (MB)':>12}{'py alloc (MB)':>15}")
+        for stage, measured in results[scenario].items():
+            print(
+                f"{stage:<28}{measured['seconds'] * 1000:>12.2f}"
+                f"{measured['rss_bytes'] / 1e6:>12.1f}"
+                f"{measured['alloc_bytes'] / 1e6:>15.2f}"
+            )
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"\nSaved baseline to {args.baseline}")
+
+    if args.check:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = check_regressions(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            print("\n".join(regressions))
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark dashboard rerun latency on a warm cache.
+
+The processed frames for a synthetic season are written to a temporary data
+directory just before the app starts, so the refresher serves them (and its
+first refresh reuses them) without calling the AWDB API. The app is then run
+headlessly with Streamlit's AppTest: one cold run, followed by reruns of the
+unchanged page, as a widget interaction would trigger.
+
+Usage:
+    python benchmarks/bench_rerun.py --reruns 20
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = tempfile.mkdtemp(prefix="snow-bench-")
+os.environ["SNOW_DATA_DIR"] = DATA_DIR
+sys.path.insert(0, str(ROOT))
+
+from snow_pipeline import (  # noqa: E402
+    ROLLUP_PERIODS,
+    TimeRangeIndex,
+    build_heatmap_matrix,
+    build_latest_index,
+    build_rollup,
+    process_weather_data_with_qc,
+    read_weather_data,
+)
+from snow_store import save_processed_frame  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from synthetic import ELEMENTS, synthetic_payload  # noqa: E402
+
+# Must match snow_snapshot.SEASON_START for the dashboard's cache lookups to hit
+SEASON_START = "2025-10-01"
+
+
+def write_processed_frames(stations, hours):
+    """Cache processed frames for synthetic stations; returns their triplets"""
+    observations = read_weather_data(synthetic_payload(stations=stations, hours=hours))
+    station_triplets = observations.get_column("stationTriplet").unique().to_list()
+    hourly, qc_counts = process_weather_data_with_qc(observations)
+    frames = {
+        "hourly": hourly,
+        "latest": build_latest_index(observations),
+        "heatmap": build_heatmap_matrix(TimeRangeIndex(hourly)),
+        "qc": qc_counts,
+    }
+    for kind, every in ROLLUP_PERIODS.items():
+        frames[kind] = build_rollup(hourly, every)
+    for kind, frame in frames.items():
+        save_processed_frame(frame, station_triplets, ELEMENTS, SEASON_START, kind)
+    return station_triplets
+
+
+def run(args):
+    """Time one cold run and args.reruns warm reruns of the dashboard"""
+    station_triplets = write_processed_frames(args.stations, args.hours)
+    os.environ["SNOTEL_STATIONS"] = ",".join(station_triplets)
+
+    app = AppTest.from_file(str(ROOT / "tahoe-snow-dashboard.py"), default_timeout=60)
+    start = time.perf_counter()
+    app.run()
+    cold = time.perf_counter() - start
+    if app.exception:
+        raise SystemExit(app.exception[0].value)
+
+    timings = []
+    for _ in range(args.reruns):
+        start = time.perf_counter()
+        app.run()
+        timings.append(time.perf_counter() - start)
+    return cold, sorted(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=1)
+    parser.add_argument("--hours", type=int, default=365 * 24)
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        cold, timings = run(args)
+    finally:
+        shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+    print(f"{args.stations} stations, {args.hours} hours")
+    print(f"cold run:      {cold * 1000:8.1f} ms")
+    print(f"rerun median:  {timings[len(timings) // 2] * 1000:8.1f} ms")
+    print(f"rerun best:    {timings[0] * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Synthetic AWDB payloads for offline benchmarking.
+
+Readings follow the rough shape of a Sierra snowpack: storms that build SNWD
+and WTEQ, settlement between storms, spring melt, and a diurnal TOBS cycle.
+Null readings and multi-hour outages (missing hours) are injected at
+configurable rates.
+"""
+
+import json
+import math
+import random
+from datetime import datetime, timedelta
+
+ELEMENTS = ["SNWD", "SNDN", "SNRR", "SWE", "WTEQ", "TOBS"]
+
+
+def _station_series(rng, hours):
+    """Hourly SNWD, WTEQ and TOBS readings for one station"""
+    snwd, wteq = 0.0, 0.0
+    storm_hours_left = 0
+    for hour in range(hours):
+        season_fraction = (hour % (365 * 24)) / (365 * 24)
+        melting = season_fraction > 0.55
+
+        if storm_hours_left == 0 and rng.random() < 0.004:
+            storm_hours_left = rng.randint(6, 48)
+        if storm_hours_left:
+            storm_hours_left -= 1
+            new_snow = rng.uniform(0, 1.5)
+            snwd += new_snow
+            wteq += new_snow * rng.uniform(0.05, 0.15)
+        elif melting:
+            wteq = max(0.0, wteq - rng.uniform(0, 0.05))
+            snwd = max(0.0, snwd - rng.uniform(0, 0.4))
+        else:
+            snwd = max(0.0, snwd - rng.uniform(0, 0.05))
+
+        daily_cycle = math.sin(2 * math.pi * ((hour % 24) - 9) / 24)
+        tobs = 25 + 20 * season_fraction + 8 * daily_cycle + rng.gauss(0, 2)
+        yield {
+            "SNWD": round(snwd, 1),
+            "WTEQ": round(wteq, 1),
+            "TOBS": round(tobs, 1),
+            "SNDN": round(100 * wteq / snwd, 1) if snwd else None,
+            "SNRR": round(rng.uniform(0, 1), 2),
+            "SWE": round(wteq, 1),
+        }
+
+
+def synthetic_payload(
+    stations=1,
+    elements=ELEMENTS,
+    hours=365 * 24,
+    null_rate=0.01,
+    gap_rate=0.002,
+    max_gap_hours=12,
+    begin=datetime(2024, 10, 1),
+    seed=0,
+):
+    """Raw AWDB response bytes for `stations` stations and `hours` hours.
+
+    Each hour is null with probability `null_rate`; with probability
+    `gap_rate` an outage of up to `max_gap_hours` hours starts, during which
+    the hours are missing from the response entirely.
+    """
+    rng = random.Random(seed)
+    response = []
+    for station in range(stations):
+        columns = {element: [] for element in elements}
+        gap_hours_left = 0
+        series = _station_series(rng, hours)
+        for hour, readings in enumerate(series):
+            if gap_hours_left == 0 and rng.random() < gap_rate:
+                gap_hours_left = rng.randint(1, max_gap_hours)
+            if gap_hours_left:
+                gap_hours_left -= 1
+                continue
+
+            date = (begin + timedelta(hours=hour)).strftime("%Y-%m-%d %H:%M")
+            for element in elements:
+                value = None if rng.random() < null_rate else readings[element]
+                columns[element].append({"date": date, "value": value})
+
+        response.append(
+            {
+                "stationTriplet": f"{700 + station}:CA:SNTL",
+                "data": [
+                    {
+                        "stationElement": {
+                            "elementCode": element,
+                            "ordinal": 1,
+                            "durationName": "HOURLY",
+                        },
+                        "values": values,
+                    }
+                    for element, values in columns.items()
+                ],
+            }
+        )
+    return json.dumps(response).encode()
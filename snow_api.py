@@ -0,0 +1,351 @@
+"""Headless HTTP data API over the shared processed SNOTEL store.
+
+Serves the frames the dashboard's refresher writes to .snow_data/processed/,
+so other services can read the processed numbers without a Streamlit
+session or their own AWDB calls. The API never fetches from AWDB; it maps
+the newest snapshot on disk and reloads it when a refresh rewrites it.
+
+Endpoints (GET; JSON records by default, Arrow IPC stream with ?format=arrow
+or Accept: application/vnd.apache.arrow.stream):
+    /stations                                 stations and their newest hour
+    /latest?station=784:CA:SNTL               last value and time per element
+    /changes?station=784:CA:SNTL&window=day   percent change per element
+    /series/hourly?station=...&start=2026-01-01&end=2026-01-08&columns=SNWD,TOBS
+    /series/daily?station=...&last=30d        also /series/weekly
+
+`station` is optional for /latest and /changes. Responses carry an ETag
+(answered with 304 on If-None-Match) and are gzipped when the client
+accepts it.
+
+Usage:
+    python snow_api.py --port 8600
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import polars as pl
+
+from snow_pipeline import COMPARISON_WINDOWS, ROLLUP_PERIODS, get_period_changes
+from snow_snapshot import SNAPSHOT_KINDS, load_cached_weather_data, snapshot_version
+from snow_store import refresh_lock
+
+logger = logging.getLogger(__name__)
+
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+
+# Bodies smaller than this are sent uncompressed
+GZIP_MIN_BYTES = 1024
+
+# Rendered responses kept per snapshot version
+RESPONSE_CACHE_SIZE = 256
+
+# "last" windows for series requests, e.g. 72h, 30d, 4w
+LAST_PATTERN = re.compile(r"(\d+)([hdw])")
+LAST_UNITS = {"h": "hours", "d": "days", "w": "weeks"}
+
+
+class ApiError(Exception):
+    """A request the API rejects, with the HTTP status to answer it with"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class SnapshotCache:
+    """The newest complete snapshot on disk, reloaded when a refresh rewrites it.
+
+    Each request only stats the snapshot files. A reload waits for the
+    shared refresh lock, so it never reads a refresh that is half written.
+    While no processed frame exists there is nothing to wait for, so an
+    empty store answers at once rather than queueing behind a dashboard's
+    cold first refresh.
+    """
+
+    def __init__(self):
+        self._version = None
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """(version, snapshot); raises ApiError while the store is empty"""
+        with self._lock:
+            version = snapshot_version()
+            if version != self._version:
+                snapshot = None
+                if any(version[: len(SNAPSHOT_KINDS)]):
+                    with refresh_lock():
+                        version = snapshot_version()
+                        snapshot = load_cached_weather_data()
+                self._version, self._snapshot = version, snapshot
+            if self._snapshot is None:
+                raise ApiError(503, "No processed data yet; run the dashboard first")
+            return self._version, self._snapshot
+
+
+def require_station(snapshot, params):
+    """The requested station, which must be in the snapshot"""
+    station_triplet = params.get("station")
+    if not station_triplet:
+        raise ApiError(400, "Missing station parameter")
+    if station_triplet not in snapshot["index"]["hourly"].stations():
+        raise ApiError(404, f"Unknown station {station_triplet}")
+    return station_triplet
+
+
+def parse_time(params, name):
+    """A naive ISO 8601 timestamp parameter, or None when absent.
+
+    Readings are dated in the station's local standard time without an
+    offset, so timestamps with one are rejected rather than guessed at.
+    """
+    value = params.get(name)
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ApiError(400, f"Invalid {name}: {value}")
+    if parsed.tzinfo is not None:
+        raise ApiError(
+            400, f"Invalid {name}: {value}; use station local time without an offset"
+        )
+    return parsed
+
+
+def stations_frame(snapshot, params):
+    """Every station in the snapshot with its newest hour"""
+    index = snapshot["index"]["hourly"]
+    return pl.DataFrame(
+        {
+            "stationTriplet": index.stations(),
+            "date": [index.newest(station) for station in index.stations()],
+        }
+    )
+
+
+def latest_frame(snapshot, params):
+    """Last known value and its timestamp per element"""
+    latest = snapshot["latest"]
+    if "station" in params:
+        station_triplet = require_station(snapshot, params)
+        latest = latest.filter(pl.col("stationTriplet") == station_triplet)
+    return latest
+
+
+def changes_frame(snapshot, params):
+    """Percent change per element over a COMPARISON_WINDOWS window"""
+    window = params.get("window", "day")
+    if window not in COMPARISON_WINDOWS:
+        raise ApiError(
+            400, f"Unknown window {window}; use {', '.join(COMPARISON_WINDOWS)}"
+        )
+    station_triplets = (
+        [require_station(snapshot, params)] if "station" in params else None
+    )
+    return get_period_changes(snapshot, window, station_triplets=station_triplets)
+
+
+def series_frame(snapshot, params, kind):
+    """A station's hourly rows or rollup periods, sliced by time.
+
+    Takes either `start`/`end` (start <= date < end) or `last` (e.g. 72h or
+    30d before the newest row), and an optional comma-separated `columns`.
+    """
+    station_triplet = require_station(snapshot, params)
+    index = snapshot["index"][kind]
+    if "last" in params:
+        match = LAST_PATTERN.fullmatch(params["last"])
+        if match is None:
+            raise ApiError(400, f"Invalid last: {params['last']}; use e.g. 72h or 30d")
+        try:
+            period = timedelta(**{LAST_UNITS[match[2]]: int(match[1])})
+            rows = index.last(station_triplet, period)
+        except OverflowError:
+            raise ApiError(400, f"Invalid last: {params['last']}; window too long")
+    else:
+        rows = index.between(
+            station_triplet, parse_time(params, "start"), parse_time(params, "end")
+        )
+
+    if "columns" not in params:
+        return rows
+    requested = params["columns"].split(",")
+    if not all(requested):
+        raise ApiError(400, f"Invalid columns: {params['columns']}")
+    # The key columns are always included
+    columns = [
+        column
+        for column in dict.fromkeys(requested)
+        if column not in ("stationTriplet", "date")
+    ]
+    unknown = [column for column in columns if column not in rows.columns]
+    if unknown:
+        raise ApiError(400, f"Unknown columns: {', '.join(unknown)}")
+    return rows.select("stationTriplet", "date", *columns)
+
+
+ROUTES = {
+    "/stations": stations_frame,
+    "/latest": latest_frame,
+    "/changes": changes_frame,
+    "/series/hourly": lambda snapshot, params: series_frame(snapshot, params, "hourly"),
+    **{
+        f"/series/{kind}": lambda snapshot, params, kind=kind: series_frame(
+            snapshot, params, kind
+        )
+        for kind in ROLLUP_PERIODS
+    },
+}
+
+
+def serialize(df, fmt):
+    """Body bytes and content type of a frame as JSON records or Arrow IPC"""
+    if fmt == "arrow":
+        buffer = io.BytesIO()
+        df.write_ipc_stream(buffer)
+        return buffer.getvalue(), ARROW_STREAM_TYPE
+    return df.write_json().encode(), "application/json"
+
+
+class DataApi:
+    """Routes requests to frames and caches the rendered responses.
+
+    Responses are keyed by snapshot version and request, so repeated
+    requests between refreshes are served from memory, ETag and gzipped
+    body included.
+    """
+
+    def __init__(self):
+        self.snapshots = SnapshotCache()
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def respond(self, path, params, fmt):
+        """(body, gzipped body or None, content type, ETag) for a request"""
+        route = ROUTES.get(path)
+        if route is None:
+            raise ApiError(404, f"Unknown path {path}")
+        version, snapshot = self.snapshots.get()
+
+        key = (version, path, tuple(sorted(params.items())), fmt)
+        with self._lock:
+            if key in self._responses:
+                self._responses.move_to_end(key)
+                return self._responses[key]
+
+        body, content_type = serialize(route(snapshot, params), fmt)
+        compressed = gzip.compress(body) if len(body) >= GZIP_MIN_BYTES else None
+        etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+        response = (body, compressed, content_type, etag)
+        with self._lock:
+            self._responses[key] = response
+            while len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return response
+
+
+class DataApiHandler(BaseHTTPRequestHandler):
+    """HTTP front end of a DataApi (set as the server's `api` attribute)"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        # Blank values are kept so that e.g. ?station= is rejected, not ignored
+        params = {
+            name: values[-1]
+            for name, values in parse_qs(url.query, keep_blank_values=True).items()
+        }
+        accept = self.headers.get("Accept", "")
+        fmt = params.pop("format", "arrow" if ARROW_STREAM_TYPE in accept else "json")
+        if fmt not in ("json", "arrow"):
+            self.send_error_body(400, f"Unknown format {fmt}; use json or arrow")
+            return
+
+        try:
+            body, compressed, content_type, etag = self.server.api.respond(
+                url.path.rstrip("/") or "/", params, fmt
+            )
+        except ApiError as e:
+            self.send_error_body(e.status, str(e))
+            return
+        except Exception:
+            logger.exception("Failed to answer %s", self.path)
+            self.send_error_body(500, "Internal error")
+            return
+
+        use_gzip = compressed is not None and "gzip" in self.headers.get(
+            "Accept-Encoding", ""
+        )
+        if use_gzip:
+            # Each encoding of a body is its own representation
+            body, etag = compressed, etag[:-1] + '-gz"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept, Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_body(self, status, message):
+        body = json.dumps({"error": message}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.info("%s %s", self.address_string(), format % args)
+
+
+def make_server(host, port):
+    """A threaded HTTP server for the data API (not yet serving)"""
+    server = ThreadingHTTPServer((host, port), DataApiHandler)
+    server.api = DataApi()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    server = make_server(args.host, args.port)
+    logger.info("Serving SNOTEL data on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
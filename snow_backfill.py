@@ -0,0 +1,174 @@
+"""Parallel, resumable backfill of past seasons of hourly SNOTEL data.
+
+Each station's history is downloaded one water year (October 1 through
+September 30) per request, with a bounded pool of concurrent requests, and
+written to a partitioned store under .snow_data/history/ (see
+snow_store.scan_history). Completed water years already on disk are skipped,
+so an interrupted backfill picks up where it stopped; the current water year
+is never complete and is fetched again on every run. Afterwards the
+season-over-season normals the dashboard overlays are rebuilt from every
+stored past season.
+
+Usage:
+    python snow_backfill.py 784:CA:SNTL --first-water-year 2006
+    python snow_backfill.py 784:CA:SNTL 539:CA:SNTL --workers 6
+"""
+
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import polars as pl
+
+from awdb_client import AWDBClient
+from snow_pipeline import build_season_normals
+from snow_snapshot import ELEMENTS, STATION_TRIPLETS
+from snow_store import (
+    history_partition_path,
+    save_history_partition,
+    save_season_normals,
+    scan_history,
+)
+
+logger = logging.getLogger(__name__)
+
+# Elements backfilled for every hour: the ones the dashboard loads
+BACKFILL_ELEMENTS = ELEMENTS
+
+# Upper bound on simultaneous AWDB requests. Each request is one station's
+# water year, so a few in flight keep the link busy without flooding the API.
+BACKFILL_WORKERS = 4
+
+# Seasons fetched when no first water year is given
+DEFAULT_SEASONS = 20
+
+
+def water_year(date):
+    """Water year of a date; water year N runs from October N-1 to September N"""
+    return date.year + 1 if date.month >= 10 else date.year
+
+
+def water_year_bounds(year):
+    """First and last hour of a water year"""
+    return datetime(year - 1, 10, 1), datetime(year, 9, 30, 23)
+
+
+def pending_chunks(station_triplets, water_years, now=None):
+    """(station, water year) chunks still to download.
+
+    A chunk is done once its partition exists, except for the water year in
+    progress, which keeps growing and is always fetched again.
+    """
+    current = water_year(now or datetime.now())
+    return [
+        (station_triplet, year)
+        for station_triplet in station_triplets
+        for year in water_years
+        if year >= current or not history_partition_path(station_triplet, year).exists()
+    ]
+
+
+def backfill_chunk(client, station_triplet, year, elements=BACKFILL_ELEMENTS):
+    """Download one station's water year and write its partition; returns rows"""
+    begin, end = water_year_bounds(year)
+    observations = client.get_data(
+        station_triplet, elements, begin, stream=True, end_date=end
+    ).filter(pl.col("date").is_between(begin, end))
+    save_history_partition(observations, station_triplet, year)
+    return observations.height
+
+
+def backfill(
+    station_triplets,
+    water_years,
+    workers=BACKFILL_WORKERS,
+    elements=BACKFILL_ELEMENTS,
+    client=None,
+):
+    """Download every pending chunk with a bounded pool of workers.
+
+    A failed chunk is logged and left pending for the next run rather than
+    stopping the others. Returns the number of chunks written and the failed
+    (station, water year) pairs.
+    """
+    chunks = pending_chunks(station_triplets, water_years)
+    if client is None:
+        client = AWDBClient(max_connections=workers)
+
+    written, failed = 0, []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(backfill_chunk, client, *chunk, elements): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            station, year = futures[future]
+            try:
+                rows = future.result()
+            except Exception:
+                logger.exception("Backfill of %s water year %s failed", station, year)
+                failed.append((station, year))
+                continue
+            written += 1
+            logger.info(
+                "%s water year %s: %d rows (%d/%d)",
+                station,
+                year,
+                rows,
+                written + len(failed),
+                len(chunks),
+            )
+    return written, failed
+
+
+def rebuild_season_normals(now=None):
+    """Recompute the normals from all completed water years in the store"""
+    history = scan_history()
+    if history is None:
+        return None
+    normals = build_season_normals(
+        history, before_water_year=water_year(now or datetime.now())
+    )
+    save_season_normals(normals)
+    return normals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "stations",
+        nargs="*",
+        default=STATION_TRIPLETS,
+        help="station triplets (default: SNOTEL_STATIONS or Palisades Tahoe)",
+    )
+    current = water_year(datetime.now())
+    parser.add_argument(
+        "--first-water-year", type=int, default=current - DEFAULT_SEASONS + 1
+    )
+    parser.add_argument("--last-water-year", type=int, default=current)
+    parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    water_years = range(args.first_water_year, args.last_water_year + 1)
+
+    start = time.perf_counter()
+    written, failed = backfill(args.stations, water_years, workers=args.workers)
+    logger.info("Wrote %d water years in %.1f s", written, time.perf_counter() - start)
+
+    normals = rebuild_season_normals()
+    if normals is not None:
+        logger.info("Rebuilt season normals (%d rows)", normals.height)
+    if failed:
+        logger.error(
+            "%d water years failed; run again to resume: %s",
+            len(failed),
+            ", ".join(f"{station} {year}" for station, year in failed),
+        )
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
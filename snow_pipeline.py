@@ -0,0 +1,996 @@
+"""Polars transforms from raw AWDB responses to dashboard-ready frames"""
+
+import io
+from datetime import date, datetime, time, timedelta
+
+import ijson
+import polars as pl
+
+from snow_store import ELEMENT_CODES, OBSERVATION_SCHEMA
+
+# Only the fields the dashboard uses; anything else in the response is skipped
+# by the JSON reader instead of being decoded into Python objects.
+AWDB_RESPONSE_SCHEMA = {
+    "stationTriplet": pl.String,
+    "data": pl.List(
+        pl.Struct(
+            {
+                "stationElement": pl.Struct({"elementCode": pl.String}),
+                "values": pl.List(pl.Struct({"date": pl.String, "value": pl.Float32})),
+            }
+        )
+    ),
+}
+
+
+def read_weather_data(raw_json):
+    """Read a raw AWDB response body into long-format observations.
+
+    The bytes are decoded by Polars' native JSON reader and flattened with
+    explode/unnest, so no Python object is built per hourly reading.
+    """
+    try:
+        stations = pl.read_json(io.BytesIO(raw_json), schema=AWDB_RESPONSE_SCHEMA)
+    except pl.exceptions.PolarsError as e:
+        raise ValueError(f"Malformed JSON: {e}")
+
+    # Validate response structure
+    if stations.height == 0:
+        raise ValueError("Invalid API response structure")
+    if stations.get_column("data").null_count() == stations.height:
+        raise ValueError("Missing 'data' field in API response")
+
+    return (
+        stations.explode("data")
+        .unnest("data")
+        .select(
+            "stationTriplet",
+            pl.col("stationElement").struct.field("elementCode"),
+            "values",
+        )
+        .explode("values")
+        .unnest("values")
+        # Empty lists explode to a single null row
+        .filter(pl.col("date").is_not_null())
+        .with_columns(pl.col("date").str.strptime(pl.Datetime("us"), "%Y-%m-%d %H:%M"))
+        .cast(OBSERVATION_SCHEMA)
+    )
+
+
+# Rows per batch emitted by the streaming reader
+STREAM_BATCH_ROWS = 50_000
+
+
+def _observation_batch(stations, elements, dates, values):
+    """Build one long-format batch from column buffers"""
+    return (
+        pl.DataFrame(
+            {
+                "stationTriplet": stations,
+                "elementCode": elements,
+                "date": dates,
+                "value": values,
+            },
+            schema={
+                "stationTriplet": pl.String,
+                "elementCode": pl.String,
+                "date": pl.String,
+                "value": pl.Float32,
+            },
+        )
+        .with_columns(pl.col("date").str.strptime(pl.Datetime("us"), "%Y-%m-%d %H:%M"))
+        .cast(OBSERVATION_SCHEMA)
+    )
+
+
+def iter_weather_batches(stream, batch_size=STREAM_BATCH_ROWS):
+    """Incrementally parse an AWDB response body into long-format batches.
+
+    `stream` is any file-like object (e.g. a streamed ``response.raw``). The
+    ``data[].values[]`` arrays are parsed event by event and flushed every
+    `batch_size` rows, so peak memory follows the batch size rather than the
+    response size. Yields frames with the same schema as read_weather_data().
+    """
+    stations, elements, dates, values = [], [], [], []
+    station_triplet = element_code = date = value = None
+    seen_station = seen_data = False
+
+    try:
+        for prefix, event, datum in ijson.parse(stream, use_float=True):
+            if prefix == "item.data.item.values.item.date":
+                date = datum
+            elif prefix == "item.data.item.values.item.value":
+                value = datum
+            elif prefix == "item.data.item.values.item" and event == "end_map":
+                stations.append(station_triplet)
+                elements.append(element_code)
+                dates.append(date)
+                values.append(value)
+                date = value = None
+                if len(dates) >= batch_size:
+                    yield _observation_batch(stations, elements, dates, values)
+                    stations, elements, dates, values = [], [], [], []
+            elif prefix == "item.data.item.stationElement.elementCode":
+                element_code = datum
+            elif prefix == "item.stationTriplet":
+                station_triplet = datum
+            elif prefix == "item" and event == "start_map":
+                seen_station = True
+            elif prefix == "item.data" and event == "start_array":
+                seen_data = True
+    except ijson.JSONError as e:
+        raise ValueError(f"Malformed JSON: {e}")
+
+    # Validate response structure
+    if not seen_station:
+        raise ValueError("Invalid API response structure")
+    if not seen_data:
+        raise ValueError("Missing 'data' field in API response")
+
+    if dates:
+        yield _observation_batch(stations, elements, dates, values)
+
+
+# Minimum hourly snow depth increase (inches) to count as real accumulation.
+# Filters out sensor noise and minor settlement when computing new-snow density.
+MIN_ACCUMULATION_INCHES = 0.5
+
+
+# Largest jump (element units) from the centered rolling median of the
+# surrounding hours that still counts as a real reading rather than a spike
+QC_SPIKE_THRESHOLDS = {"SNWD": 6.0, "WTEQ": 1.0, "TOBS": 15.0}
+
+# Hours in the centered rolling-median window used for spike detection
+QC_MEDIAN_WINDOW = 7
+
+# Longest run of missing or rejected hours filled by linear interpolation;
+# longer gaps stay null
+QC_MAX_GAP_HOURS = 3
+
+
+# Elements pivoted into the hourly frame. The other fetched elements (SNDN,
+# SNRR and SWE, which duplicates WTEQ) stay in the observation history and
+# the last-value index, but nothing charts or derives from them hourly.
+HOURLY_ELEMENTS = ["SNWD", "WTEQ", "TOBS"]
+
+
+def hourly_grid_plan(observations, elements=HOURLY_ELEMENTS):
+    """Lazy pivot of long-format observations onto a complete hourly grid.
+
+    Rows are keyed by (stationTriplet, date) with one column per entry of
+    `elements` (null where a station does not report it). Every hour between
+    a station's first and last observation gets a row; hours the response
+    left out have null readings and a null "observed".
+    """
+    observations = observations.lazy().with_columns(
+        pl.col("stationTriplet").cast(pl.Categorical)
+    )
+    pivoted = observations.pivot(
+        on="elementCode",
+        on_columns=elements,
+        index=["stationTriplet", "date"],
+        values="value",
+    ).with_columns(pl.lit(True).alias("observed"))
+    grid = (
+        observations.group_by("stationTriplet")
+        .agg(pl.datetime_ranges(pl.col("date").min(), pl.col("date").max(), "1h"))
+        .explode("date")
+    )
+    # Sorted so diff() and the row-based QC windows see consecutive hours
+    return grid.join(pivoted, on=["stationTriplet", "date"], how="left").sort(
+        ["stationTriplet", "date"]
+    )
+
+
+def quality_control(
+    plan,
+    thresholds=QC_SPIKE_THRESHOLDS,
+    window=QC_MEDIAN_WINDOW,
+    max_gap_hours=QC_MAX_GAP_HOURS,
+):
+    """Reject spikes and fill short gaps in the hourly grid (lazy, per station).
+
+    A reading further than its element's threshold from the centered rolling
+    median of the surrounding `window` hours is treated as missing. Runs of
+    up to `max_gap_hours` missing hours between two readings are linearly
+    interpolated. Adds "<element>_spike" and "<element>_filled" flags for
+    every thresholded element present in the plan.
+    """
+    columns = plan.collect_schema().names()
+    elements = [element for element in thresholds if element in columns]
+
+    def rolling_median(element):
+        return (
+            pl.col(element)
+            .rolling_median(window, center=True, min_samples=1)
+            .over("stationTriplet")
+        )
+
+    plan = plan.with_columns(
+        ((pl.col(element) - rolling_median(element)).abs() > thresholds[element])
+        .fill_null(False)
+        .alias(f"{element}_spike")
+        for element in elements
+    ).with_columns(
+        pl.when(pl.col(f"{element}_spike"))
+        .then(None)
+        .otherwise(pl.col(element))
+        .alias(element)
+        for element in elements
+    )
+
+    # Each gap shares a group with the reading before it, so a group's null
+    # count is the gap length
+    def gap_length(element):
+        reading_run = pl.col(element).is_not_null().cum_sum()
+        return (
+            pl.col(element)
+            .is_null()
+            .sum()
+            .over("stationTriplet", reading_run.over("stationTriplet"))
+        )
+
+    plan = plan.with_columns(
+        (pl.col(element).is_null() & (gap_length(element) <= max_gap_hours)).alias(
+            f"{element}_fill"
+        )
+        for element in elements
+    )
+    return (
+        plan.with_columns(
+            pl.when(pl.col(f"{element}_fill"))
+            .then(pl.col(element).interpolate().over("stationTriplet"))
+            .otherwise(pl.col(element))
+            .alias(element)
+            for element in elements
+        )
+        .with_columns(
+            (pl.col(f"{element}_fill") & pl.col(element).is_not_null()).alias(
+                f"{element}_filled"
+            )
+            for element in elements
+        )
+        .drop(f"{element}_fill" for element in elements)
+    )
+
+
+def qc_flag_columns(plan):
+    """Bookkeeping columns added by hourly_grid_plan() and quality_control()"""
+    return [
+        column
+        for column in plan.collect_schema().names()
+        if column == "observed" or column.endswith(("_spike", "_filled"))
+    ]
+
+
+def qc_counts(plan):
+    """Per-station, per-element QC counts from a quality-controlled plan (lazy).
+
+    Counts the grid hours, hours missing from the response, rejected spikes,
+    interpolated hours and hours still missing after QC.
+    """
+    elements = [
+        column[: -len("_spike")]
+        for column in plan.collect_schema().names()
+        if column.endswith("_spike")
+    ]
+    return pl.concat(
+        plan.group_by("stationTriplet").agg(
+            pl.lit(element).cast(ELEMENT_CODES).alias("elementCode"),
+            pl.len().alias("hours"),
+            pl.col("observed").null_count().alias("inserted"),
+            pl.col(f"{element}_spike").sum().alias("spikes"),
+            pl.col(f"{element}_filled").sum().alias("filled"),
+            pl.col(element).null_count().alias("missing"),
+        )
+        for element in elements
+    ).sort("stationTriplet", "elementCode")
+
+
+def add_derived_columns(plan):
+    """Densities and rolling means on the quality-controlled hourly grid.
+
+    Drops the QC bookkeeping columns.
+    """
+    # Hour-over-hour deltas feed the new-snow density; they are not kept as
+    # columns of their own
+    delta_snwd = pl.col("SNWD").diff(1).over("stationTriplet")
+    delta_wteq = pl.col("WTEQ").diff(1).over("stationTriplet")
+
+    # Bulk snowpack density: ρ_s = (1000 × WTEQ) / SNWD in kg/m³
+    # Both WTEQ and SNWD are hourly readings in inches; hours without snow
+    # water (WTEQ = 0) have no meaningful density and are left null.
+    # New-snow (layer) density: density of the snow that fell in the last hour.
+    # Only populated when accumulation >= MIN_ACCUMULATION_INCHES and WTEQ is also rising,
+    # which filters out settlement, melt, and sensor noise.
+    plan = plan.drop(qc_flag_columns(plan)).with_columns(
+        pl.when((pl.col("WTEQ") > 0) & (pl.col("SNWD") > 0))
+        .then(1000.0 * pl.col("WTEQ") / pl.col("SNWD"))
+        .otherwise(None)
+        .alias("snow_density"),
+        pl.when((delta_snwd >= MIN_ACCUMULATION_INCHES) & (delta_wteq > 0))
+        .then(1000.0 * delta_wteq / delta_snwd)
+        .otherwise(None)
+        .alias("new_snow_density"),
+    )
+
+    # Trailing time-window means (24h density, 6h/24h/72h SNWD, WTEQ, TOBS)
+    return add_rolling_means(plan)
+
+
+def weather_data_plan(observations, elements=HOURLY_ELEMENTS):
+    """Lazy query from long-format observations to the wide hourly frame.
+
+    Pivots onto a complete hourly grid, quality-controls the readings, then
+    derives densities and rolling means. Nothing is computed until the plan
+    is collected, so callers can select the columns and time range they need
+    and let the optimizer prune the rest.
+    """
+    return add_derived_columns(
+        quality_control(hourly_grid_plan(observations, elements))
+    )
+
+
+def process_weather_data(observations_df):
+    """Process long-format observations into a structured dataframe"""
+    return weather_data_plan(observations_df).collect()
+
+
+def process_weather_data_with_qc(observations_df):
+    """Processed hourly frame plus its QC counts from one shared query.
+
+    The QC stage runs once; collect_all() shares it between both outputs.
+    """
+    plan = quality_control(hourly_grid_plan(observations_df))
+    hourly, counts = pl.collect_all([add_derived_columns(plan), qc_counts(plan)])
+    return hourly, counts
+
+
+def downsample_min_max(df, column, max_points, time_column="date"):
+    """Reduce a time series to at most ~max_points rows for charting.
+
+    The visible time range is split into max_points / 2 equal buckets (whole
+    hours) and only the minimum and maximum reading of each bucket is kept,
+    so peaks and troughs survive while the payload stays flat as the range
+    grows. Returns the time and value columns in time order.
+    """
+    series = df.select(time_column, column).drop_nulls().sort(time_column)
+    if series.height <= max_points:
+        return series
+
+    start, end = series.item(0, time_column), series.item(-1, time_column)
+    span_hours = (end - start).total_seconds() / 3600
+    bucket_hours = max(1, -(-int(span_hours) // (max_points // 2)))
+
+    position = pl.int_range(pl.len()).over("bucket")
+    return (
+        series.with_columns(
+            ((pl.col(time_column) - start).dt.total_hours() // bucket_hours).alias(
+                "bucket"
+            )
+        )
+        .filter(
+            (position == pl.col(column).arg_min().over("bucket"))
+            | (position == pl.col(column).arg_max().over("bucket"))
+        )
+        .drop("bucket")
+    )
+
+
+class TimeRangeIndex:
+    """Time-range lookups on a frame sorted by (stationTriplet, date).
+
+    Each station's rows form one contiguous block. The block offsets are
+    found once, in a single run-length pass. After that a lookup is a binary
+    search (search_sorted) on the block's dates plus a zero-copy slice,
+    instead of a filter over the whole frame.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        runs = df.select(pl.col("stationTriplet").rle()).unnest("stationTriplet")
+        lengths = runs.get_column("len")
+        self._blocks = dict(
+            zip(
+                runs.get_column("value").to_list(),
+                zip((lengths.cum_sum() - lengths).to_list(), lengths.to_list()),
+            )
+        )
+
+    def stations(self):
+        """Stations in frame order"""
+        return list(self._blocks)
+
+    def station(self, station_triplet):
+        """All rows of one station (empty for an unknown station)"""
+        offset, length = self._blocks.get(station_triplet, (0, 0))
+        return self.df.slice(offset, length)
+
+    def newest(self, station_triplet):
+        """Timestamp of a station's newest row (None for an unknown station)"""
+        rows = self.station(station_triplet)
+        return rows.item(-1, "date") if rows.height else None
+
+    def between(self, station_triplet, start=None, end=None):
+        """A station's rows with start <= date < end; either bound may be None"""
+        rows = self.station(station_triplet)
+        dates = rows.get_column("date")
+        first = 0 if start is None else dates.search_sorted(start, side="left")
+        last = rows.height if end is None else dates.search_sorted(end, side="left")
+        return rows.slice(first, max(last - first, 0))
+
+    def at(self, station_triplet, date):
+        """A station's row at exactly `date` (empty if there is none)"""
+        rows = self.station(station_triplet)
+        dates = rows.get_column("date")
+        first = dates.search_sorted(date, side="left")
+        return rows.slice(first, dates.search_sorted(date, side="right") - first)
+
+    def last(self, station_triplet, period):
+        """A station's rows less than `period` (a timedelta) before its newest row"""
+        newest = self.newest(station_triplet)
+        if newest is None:
+            return self.df.clear()
+        rows = self.station(station_triplet)
+        first = rows.get_column("date").search_sorted(newest - period, side="right")
+        return rows.slice(first)
+
+
+# Elements summarised in the rollup tables
+ROLLUP_ELEMENTS = ["SNWD", "TOBS", "WTEQ"]
+
+# Rollup tables maintained alongside the hourly frame: name -> period length
+ROLLUP_PERIODS = {"daily": "1d", "weekly": "1w"}
+
+
+def build_rollup(df, every, elements=ROLLUP_ELEMENTS):
+    """Aggregate the hourly frame into per-station periods of length `every`.
+
+    Each element gets min/max/mean/last columns plus a count of non-null
+    readings; `date` holds the period start.
+    """
+    aggregations = []
+    for element in elements:
+        aggregations += [
+            pl.col(element).min().alias(f"{element}_min"),
+            pl.col(element).max().alias(f"{element}_max"),
+            pl.col(element).mean().alias(f"{element}_mean"),
+            pl.col(element).drop_nulls().last().alias(f"{element}_last"),
+            pl.col(element).count().alias(f"{element}_count"),
+        ]
+    return (
+        df.sort("stationTriplet", "date")
+        .group_by("stationTriplet", pl.col("date").dt.truncate(every))
+        .agg(aggregations)
+        .sort("stationTriplet", "date")
+    )
+
+
+def update_rollup(rollup, df, every, since, elements=ROLLUP_ELEMENTS):
+    """Incrementally refresh a rollup after hours at or after `since` changed.
+
+    Only periods from the one containing `since` onward are re-aggregated
+    from the hourly frame; earlier periods are kept as they are. `since` is
+    None when the refresh brought no new hours.
+    """
+    if not rollup.is_empty():
+        # Also redo the newest stored period in case a previous refresh stopped
+        # before its rollups were written.
+        newest_period = rollup.get_column("date").max()
+        since = newest_period if since is None else min(since, newest_period)
+    elif since is None:
+        return build_rollup(df, every, elements)
+    period_start = pl.select(pl.lit(since).dt.truncate(every)).item()
+
+    fresh = build_rollup(df.filter(pl.col("date") >= period_start), every, elements)
+    return pl.concat([rollup.filter(pl.col("date") < period_start), fresh]).sort(
+        "stationTriplet", "date"
+    )
+
+
+# Trailing time windows precomputed as rolling-mean columns, per source column.
+# Each becomes a "<column>_mean_<window>" column, e.g. "SNWD_mean_6h".
+ROLLING_WINDOWS = {
+    "SNWD": ["6h", "24h", "72h"],
+    "WTEQ": ["6h", "24h", "72h"],
+    "TOBS": ["6h", "24h", "72h"],
+    "snow_density": ["24h"],
+}
+
+
+def add_rolling_means(df, windows=ROLLING_WINDOWS):
+    """Add trailing rolling-mean columns over `date`, per station (eager or lazy).
+
+    Windows are time-based rather than row-based, so missing hours shrink
+    the sample instead of stretching the window, and null readings are
+    skipped.
+    """
+    return df.with_columns(
+        pl.col(column)
+        .rolling_mean_by("date", window_size=window)
+        .over("stationTriplet")
+        .alias(f"{column}_mean_{window}")
+        for column, column_windows in windows.items()
+        for window in column_windows
+    )
+
+
+def build_latest_index(observations):
+    """Last known (non-null) value and its timestamp per station and element.
+
+    Values are decoded from Float32 storage back to the reported decimals
+    (e.g. 96.4 rather than 96.4000015), since they are displayed as-is.
+    """
+    return (
+        observations.filter(pl.col("value").is_not_null())
+        .sort("date", maintain_order=True)
+        .group_by("stationTriplet", "elementCode")
+        .agg(pl.col("date").last(), pl.col("value").last())
+        .with_columns(pl.col("value").cast(pl.Float64).round(3))
+        .sort("stationTriplet", "elementCode")
+    )
+
+
+def update_latest_index(latest_index, observations, since):
+    """Fold observations at or after `since` into the last-value index.
+
+    Only the index itself and the changed rows are read. Each station's rows
+    from its newest indexed hour onward are folded in too, in case a
+    previous refresh stored its observations but stopped before its index
+    was written. `since` is None when the refresh brought no new hours. On
+    equal timestamps the new row wins, so revised readings replace the
+    stored ones.
+    """
+    starts = latest_index.group_by("stationTriplet").agg(
+        pl.col("date").max().alias("since")
+    )
+    if since is not None:
+        starts = starts.with_columns(pl.min_horizontal("since", pl.lit(since)))
+    changed = observations.join(starts, on="stationTriplet", how="left").filter(
+        pl.col("since").is_null() | (pl.col("date") >= pl.col("since"))
+    )
+    return build_latest_index(
+        pl.concat(
+            [latest_index, changed.select(latest_index.columns)],
+            how="vertical_relaxed",
+        )
+    )
+
+
+def get_latest_metrics(latest_index, station_triplet, elements=ROLLUP_ELEMENTS):
+    """Get the latest values for each metric from the last-value index.
+
+    The index holds one row per station and element, so this is a constant-
+    time lookup regardless of history length. Returns (metrics, latest_date,
+    staleness), where staleness maps each element to how long before
+    latest_date its value was observed (None if never observed).
+    """
+    station_index = latest_index.filter(pl.col("stationTriplet") == station_triplet)
+    if station_index.is_empty():
+        raise ValueError("No data available")
+
+    latest_date = station_index.get_column("date").max()
+    latest = {
+        element: (value, date)
+        for element, date, value in station_index.select(
+            "elementCode", "date", "value"
+        ).iter_rows()
+    }
+
+    metrics, staleness = {}, {}
+    for element in elements:
+        value, date = latest.get(element, (None, None))
+        metrics[element] = value
+        staleness[element] = latest_date - date if date is not None else None
+
+    return metrics, latest_date, staleness
+
+
+# Days of hourly new-snow density kept in the heatmap grid
+HEATMAP_DAYS = 120
+
+
+def _heatmap_grid(cells, ends, days):
+    """Pack (stationTriplet, date, new_snow_density) cells into day rows.
+
+    Every station gets one row per day for the `days` days ending on its
+    date in `ends`, with the 24 hourly densities of that day in a fixed-size
+    array (null for hours without accumulation). Cells outside the window
+    are dropped.
+    """
+    grid = (
+        ends.select(
+            "stationTriplet",
+            pl.date_ranges(
+                pl.col("day") - pl.duration(days=days - 1), pl.col("day")
+            ).alias("day"),
+        )
+        .explode("day")
+        .join(pl.DataFrame({"hour": range(24)}, schema={"hour": pl.Int8}), how="cross")
+    )
+    cells = cells.select(
+        "stationTriplet",
+        pl.col("date").dt.date().alias("day"),
+        pl.col("date").dt.hour().cast(pl.Int8).alias("hour"),
+        pl.col("new_snow_density").cast(pl.Float32),
+    )
+    return (
+        grid.join(cells, on=["stationTriplet", "day", "hour"], how="left")
+        .sort("stationTriplet", "day", "hour")
+        .group_by("stationTriplet", "day", maintain_order=True)
+        .agg(pl.col("new_snow_density").alias("density"))
+        .with_columns(pl.col("density").list.to_array(24))
+    )
+
+
+def heatmap_cells(matrix):
+    """Non-empty cells of the heatmap grid as (stationTriplet, date, new_snow_density)"""
+    return (
+        matrix.with_columns(
+            pl.col("density").arr.to_list(), pl.int_ranges(0, 24).alias("hour")
+        )
+        .explode("density", "hour")
+        .drop_nulls("density")
+        .select(
+            "stationTriplet",
+            (pl.col("day").cast(pl.Datetime("us")) + pl.duration(hours="hour")).alias(
+                "date"
+            ),
+            pl.col("density").alias("new_snow_density"),
+        )
+    )
+
+
+def build_heatmap_matrix(hourly_index, days=HEATMAP_DAYS):
+    """Day x hour grid of new-snow density for each station's last `days` days.
+
+    `hourly_index` is a TimeRangeIndex over the hourly frame; only each
+    station's last `days` days are read.
+    """
+    stations = hourly_index.stations()
+    end_days = [hourly_index.newest(station).date() for station in stations]
+    cells = [
+        hourly_index.between(
+            station, datetime.combine(end_day - timedelta(days=days - 1), time())
+        )
+        for station, end_day in zip(stations, end_days)
+    ]
+    ends = pl.DataFrame(
+        {"stationTriplet": stations, "day": end_days},
+        schema={"stationTriplet": pl.Categorical, "day": pl.Date},
+    )
+    return _heatmap_grid(
+        pl.concat([hourly_index.df.clear(), *cells]).filter(
+            pl.col("new_snow_density").is_not_null()
+        ),
+        ends,
+        days,
+    )
+
+
+def update_heatmap_matrix(matrix, hourly_index, since, days=HEATMAP_DAYS):
+    """Write hours at or after `since` into the heatmap grid and slide its window.
+
+    Only the grid itself and the changed hours are read, so the cost is fixed
+    by the grid size rather than the stored history. Each station's newest
+    stored grid day is redone too, in case a previous refresh stopped before
+    its grid was written; a station new to the grid gets its whole window.
+    `since` is None when the refresh brought no new hours.
+    """
+    newest_days = dict(
+        matrix.group_by("stationTriplet").agg(pl.col("day").max()).iter_rows()
+    )
+    starts = {}
+    for station in hourly_index.stations():
+        newest_day = newest_days.get(
+            station, hourly_index.newest(station).date() - timedelta(days=days - 1)
+        )
+        starts[station] = datetime.combine(newest_day, time())
+        if since is not None:
+            starts[station] = min(starts[station], since)
+
+    fresh = pl.concat(
+        [
+            hourly_index.df.clear(),
+            *[
+                hourly_index.between(station, start)
+                for station, start in starts.items()
+            ],
+        ]
+    )
+    ends = (
+        pl.concat(
+            [
+                matrix.group_by("stationTriplet").agg(pl.col("day").max()),
+                fresh.group_by("stationTriplet").agg(
+                    pl.col("date").max().dt.date().alias("day")
+                ),
+            ]
+        )
+        .group_by("stationTriplet")
+        .agg(pl.col("day").max())
+    )
+    starts = pl.DataFrame(
+        {"stationTriplet": list(starts), "since": list(starts.values())},
+        schema={"stationTriplet": pl.Categorical, "since": pl.Datetime("us")},
+    )
+    kept = (
+        heatmap_cells(matrix)
+        .join(starts, on="stationTriplet", how="left")
+        .filter(pl.col("since").is_null() | (pl.col("date") < pl.col("since")))
+        .drop("since")
+    )
+    cells = pl.concat(
+        [
+            kept,
+            fresh.filter(pl.col("new_snow_density").is_not_null()).select(
+                "stationTriplet", "date", pl.col("new_snow_density").cast(pl.Float32)
+            ),
+        ]
+    )
+    return _heatmap_grid(cells, ends, days)
+
+
+# Elements with season-over-season normals
+NORMALS_ELEMENTS = ["SNWD", "WTEQ"]
+
+# Percentile bands of the normals: column -> quantile across past seasons
+NORMALS_PERCENTILES = {"p10": 0.1, "p50": 0.5, "p90": 0.9}
+
+
+# A water year without February 29, used to number the days of every season
+REFERENCE_WATER_YEAR_START = date(2022, 10, 1)
+
+
+def water_year_day(date):
+    """Day of the water year of a datetime expression (0-364), from October 1.
+
+    Days are numbered by calendar date in a common year, with February 29
+    folded into February 28, so a slot is the same calendar day in leap
+    and common seasons alike.
+    """
+    month = date.dt.month()
+    day = (
+        pl.when((month == 2) & (date.dt.day() == 29)).then(28).otherwise(date.dt.day())
+    )
+    reference_year = REFERENCE_WATER_YEAR_START.year + (month < 10).cast(pl.Int32)
+    return (
+        (pl.date(reference_year, month, day) - pl.lit(REFERENCE_WATER_YEAR_START))
+        .dt.total_days()
+        .cast(pl.Int16)
+    )
+
+
+def water_year_date(day, water_year_start):
+    """Datetime of a water_year_day() slot in the water year starting on a date"""
+    reference = pl.lit(REFERENCE_WATER_YEAR_START) + pl.duration(days=day)
+    month = reference.dt.month()
+    year = water_year_start.year + (month < 10).cast(pl.Int32)
+    return pl.datetime(year, month, reference.dt.day())
+
+
+def build_season_normals(history, elements=NORMALS_ELEMENTS, before_water_year=None):
+    """Percentile bands per station, element and day of the water year.
+
+    `history` is the long-format backfill (see snow_store.scan_history).
+    Each season contributes its daily mean reading to a day, and the bands
+    are taken across seasons. "last_season" keeps the daily mean of the
+    season just before before_water_year (the newest stored one when not
+    given). Water years from before_water_year on are left out, so the
+    season in progress is not part of its own normal.
+    """
+    history = history.lazy().filter(
+        pl.col("elementCode").is_in(elements), pl.col("value").is_not_null()
+    )
+    if before_water_year is not None:
+        history = history.filter(pl.col("water_year") < before_water_year)
+        last_water_year = pl.lit(before_water_year - 1)
+    else:
+        last_water_year = pl.col("water_year").max()
+    day = water_year_day(pl.col("date")).alias("day_of_water_year")
+    return (
+        history.group_by("stationTriplet", "elementCode", "water_year", day)
+        .agg(pl.col("value").mean())
+        .with_columns(last_water_year.alias("last_water_year"))
+        .group_by("stationTriplet", "elementCode", "day_of_water_year")
+        .agg(
+            *[
+                pl.col("value").quantile(q, interpolation="linear").alias(name)
+                for name, q in NORMALS_PERCENTILES.items()
+            ],
+            pl.col("value")
+            .filter(pl.col("water_year") == pl.col("last_water_year"))
+            .first()
+            .alias("last_season"),
+            pl.len().alias("seasons"),
+        )
+        .with_columns(pl.col(*NORMALS_PERCENTILES, "last_season").cast(pl.Float32))
+        .sort("stationTriplet", "elementCode", "day_of_water_year")
+        .collect()
+    )
+
+
+def season_vs_normal(daily_index, normals, station_triplet, element):
+    """A station's normals for one element, dated in its current water year.
+
+    The season so far is aligned on the same days from the daily rollup's
+    "<element>_mean" (`daily_index` is a TimeRangeIndex over it), in a
+    "value" column (null for days still ahead). Returns None when the
+    station has no normals or no data this season.
+    """
+    newest = daily_index.newest(station_triplet)
+    station_normals = normals.filter(
+        (pl.col("stationTriplet") == station_triplet)
+        & (pl.col("elementCode") == element)
+    )
+    if newest is None or station_normals.is_empty():
+        return None
+
+    season_start = datetime(newest.year - (newest.month < 10), 10, 1)
+    # February 29 shares February 28's slot; the 28th's reading is kept
+    season = (
+        daily_index.between(station_triplet, season_start)
+        .select(
+            water_year_day(pl.col("date")).alias("day_of_water_year"),
+            pl.col(f"{element}_mean").alias("value"),
+        )
+        .unique("day_of_water_year", keep="first", maintain_order=True)
+    )
+    return (
+        station_normals.select("day_of_water_year", *NORMALS_PERCENTILES)
+        .join(season, on="day_of_water_year", how="left")
+        .with_columns(
+            water_year_date(pl.col("day_of_water_year"), season_start).alias("date")
+        )
+    )
+
+
+# Comparison windows for metric deltas: name -> (frame kind, column pattern,
+# offset between the compared rows). The hourly frame's 24h rolling means give
+# a rolling comparison; the rollups give calendar comparisons. An offset of
+# None compares with the same day of the water year last season, read from
+# the backfilled normals (see compare_last_season).
+COMPARISON_WINDOWS = {
+    "day": ("daily", "{element}_mean", "1d"),
+    "24h": ("hourly", "{element}_mean_24h", "24h"),
+    "week": ("weekly", "{element}_mean", "1w"),
+    "season": ("daily", "{element}_mean", None),
+}
+
+
+def _percent_change(column):
+    """Change of a column against its "<column>_reference", in percent"""
+    previous = pl.col(f"{column}_reference")
+    return (
+        pl.when(previous != 0)
+        .then((pl.col(column) - previous) / previous.abs() * 100)
+        .otherwise(None)
+    )
+
+
+def compare_latest(index, columns, offset, station_triplets=None):
+    """Percent change between each station's newest row and the row `offset` earlier.
+
+    `index` is a TimeRangeIndex over the compared frame and `columns` maps
+    output names to value columns. Each station's two rows are binary-searched
+    and compared in one join, with the older row shifted forward by `offset`.
+    Compares every station in the index unless station_triplets is given.
+    Returns stationTriplet, date and a "<name>_percent" column per entry.
+    """
+    value_columns = list(dict.fromkeys(columns.values()))
+    latest_rows, reference_rows = [index.df.clear()], [index.df.clear()]
+    for station_triplet in station_triplets or index.stations():
+        newest = index.newest(station_triplet)
+        if newest is None:
+            continue
+        latest_rows.append(index.at(station_triplet, newest))
+        reference_date = pl.select(pl.lit(newest).dt.offset_by(f"-{offset}")).item()
+        reference_rows.append(index.at(station_triplet, reference_date))
+
+    latest = pl.concat(latest_rows).select("stationTriplet", "date", *value_columns)
+    reference = pl.concat(reference_rows).select(
+        "stationTriplet",
+        pl.col("date").dt.offset_by(offset),
+        *[pl.col(column).alias(f"{column}_reference") for column in value_columns],
+    )
+    return latest.join(reference, on=["stationTriplet", "date"], how="left").select(
+        "stationTriplet",
+        "date",
+        *[
+            _percent_change(column).alias(f"{name}_percent")
+            for name, column in columns.items()
+        ],
+    )
+
+
+def compare_last_season(index, normals, columns, station_triplets=None):
+    """Percent change between each station's newest row and that day last season.
+
+    Like compare_latest(), but `columns` maps element codes to value columns
+    and the reference is the normals' "last_season" daily mean on the same
+    day of the water year. Elements without normals (or before the first
+    backfill) compare as null.
+    """
+    latest_rows = [index.df.clear()]
+    for station_triplet in station_triplets or index.stations():
+        newest = index.newest(station_triplet)
+        if newest is not None:
+            latest_rows.append(index.at(station_triplet, newest))
+    latest = pl.concat(latest_rows).with_columns(
+        water_year_day(pl.col("date")).alias("day_of_water_year")
+    )
+
+    reference = pl.DataFrame(
+        schema={"stationTriplet": pl.Categorical, "day_of_water_year": pl.Int16}
+    )
+    if normals is not None and "last_season" in normals.columns:
+        reference = normals.filter(pl.col("elementCode").is_in(list(columns))).pivot(
+            on="elementCode",
+            index=["stationTriplet", "day_of_water_year"],
+            values="last_season",
+        )
+    reference = reference.select(
+        "stationTriplet",
+        "day_of_water_year",
+        *[
+            (
+                pl.col(element)
+                if element in reference.columns
+                else pl.lit(None, dtype=pl.Float32)
+            ).alias(f"{column}_reference")
+            for element, column in columns.items()
+        ],
+    )
+    return latest.join(
+        reference, on=["stationTriplet", "day_of_water_year"], how="left"
+    ).select(
+        "stationTriplet",
+        "date",
+        *[
+            _percent_change(column).alias(f"{element}_percent")
+            for element, column in columns.items()
+        ],
+    )
+
+
+def get_period_changes(
+    frames, window="day", elements=ROLLUP_ELEMENTS, station_triplets=None
+):
+    """Percent change of every element over a comparison window, per station.
+
+    Looks rows up through the snapshot's frames["index"] time-range indexes,
+    and the "season" window up in frames["normals"].
+    """
+    kind, pattern, offset = COMPARISON_WINDOWS[window]
+    columns = {element: pattern.format(element=element) for element in elements}
+    if offset is None:
+        return compare_last_season(
+            frames["index"][kind], frames["normals"], columns, station_triplets
+        )
+    return compare_latest(frames["index"][kind], columns, offset, station_triplets)
+
+
+def get_day_over_day_changes(
+    frames, station_triplet, window="day", elements=ROLLUP_ELEMENTS
+):
+    """Percent change of each element's average for one station, for the metric cards.
+
+    Defaults to today vs yesterday from the daily rollup; see
+    COMPARISON_WINDOWS for the other windows. Returns "<element>_percent" and
+    "<element>_direction" keys (lower-case element codes) where both periods
+    have data.
+    """
+    station_changes = get_period_changes(
+        frames, window, elements, station_triplets=[station_triplet]
+    )
+    if station_changes.is_empty():
+        return {}
+
+    changes = {}
+    row = station_changes.row(0, named=True)
+    for element in elements:
+        change = row[f"{element}_percent"]
+        if change is not None:
+            changes[f"{element.lower()}_percent"] = change
+            changes[f"{element.lower()}_direction"] = "up" if change >= 0 else "down"
+    return changes
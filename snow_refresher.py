@@ -0,0 +1,118 @@
+"""Background refresh of processed SNOTEL data (stale-while-revalidate)"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# SNOTEL hourly reports reach AWDB some minutes after the hour
+REFRESH_DELAY = timedelta(minutes=20)
+
+# Wait before retrying after a failed refresh
+RETRY_INTERVAL = timedelta(minutes=5)
+
+
+def next_refresh_time(now, delay=REFRESH_DELAY):
+    """First top-of-the-hour + delay strictly after `now`"""
+    candidate = now.replace(minute=0, second=0, microsecond=0) + delay
+    while candidate <= now:
+        candidate += timedelta(hours=1)
+    return candidate
+
+
+def current_refresh_slot(now, delay=REFRESH_DELAY):
+    """Start of the hourly refresh slot `now` falls in (the last refresh time)"""
+    return next_refresh_time(now, delay) - timedelta(hours=1)
+
+
+class BackgroundRefresher:
+    """Keep the latest snapshot fresh on a daemon thread.
+
+    Readers always get the last good snapshot immediately; a refresh builds a
+    complete new snapshot off to the side and swaps it in with a single
+    reference assignment, so a reader never sees a half-updated one. Only the
+    very first read in a process with nothing cached blocks on `refresh`.
+
+    `load_cached` returns a possibly stale snapshot (or None) to serve while
+    the first refresh runs; `refresh` fetches and returns a new snapshot.
+    """
+
+    def __init__(self, load_cached, refresh, delay=REFRESH_DELAY):
+        self._load_cached = load_cached
+        self._refresh = refresh
+        self._delay = delay
+        self._snapshot = None
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self.last_refreshed = None
+        self.last_error = None
+
+    def start(self):
+        """Load any cached snapshot and start the refresh thread"""
+        self._snapshot = self._load_cached()
+        self._thread = threading.Thread(
+            target=self._run, name="snow-refresher", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def snapshot(self):
+        """Latest good snapshot, refreshing synchronously only if there is none"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            # The refresh thread may already be building the first snapshot
+            self.refresh(since=datetime.now() - RETRY_INTERVAL)
+            snapshot = self._snapshot
+        return snapshot
+
+    def refresh(self, since=None):
+        """Build a new snapshot and swap it in; keeps the old one on failure.
+
+        Skips the refresh when the last one finished at or after `since`.
+        """
+        with self._refresh_lock:
+            if (
+                since is not None
+                and self.last_refreshed is not None
+                and self.last_refreshed >= since
+            ):
+                return True
+            try:
+                snapshot = self._refresh()
+            except Exception as e:
+                self.last_error = e
+                if self._snapshot is None:
+                    raise
+                logger.exception("Background refresh failed; serving last snapshot")
+                return False
+            self._snapshot = snapshot
+            self.last_refreshed = datetime.now()
+            self.last_error = None
+            return True
+
+    def _run(self):
+        # Catch up right away: the cached snapshot may be hours old
+        next_run = datetime.now()
+        while True:
+            wait = (next_run - datetime.now()).total_seconds()
+            if wait > 0:
+                time.sleep(wait)
+
+            try:
+                # A first page view may have refreshed synchronously during
+                # this slot; a refresh from an earlier slot (such as a
+                # catch-up just before the hour) predates this report
+                succeeded = self.refresh(
+                    since=current_refresh_slot(datetime.now(), self._delay)
+                )
+            except Exception:
+                logger.exception("Initial background refresh failed")
+                succeeded = False
+            now = datetime.now()
+            next_run = (
+                next_refresh_time(now, self._delay)
+                if succeeded
+                else now + RETRY_INTERVAL
+            )
@@ -0,0 +1,76 @@
+"""Which processed frames make up a snapshot, and how to load one from disk.
+
+Shared by the Streamlit dashboard and the headless data API (snow_api.py), so
+both read the same station set and season from the shared processed store.
+"""
+
+import os
+
+from snow_pipeline import ROLLUP_PERIODS, TimeRangeIndex
+from snow_store import (
+    processed_frame_path,
+    read_processed_frame,
+    read_season_normals,
+    season_normals_path,
+)
+
+# Stations to load, e.g. SNOTEL_STATIONS="784:CA:SNTL,809:CA:SNTL"
+STATION_TRIPLETS = os.environ.get("SNOTEL_STATIONS", "784:CA:SNTL").split(",")
+
+ELEMENTS = ["SNWD", "SNDN", "SNRR", "SWE", "WTEQ", "TOBS"]
+SEASON_START = "2025-10-01"
+
+# Processed frames written by every refresh
+SNAPSHOT_KINDS = ["hourly", "latest", "heatmap", "qc", *ROLLUP_PERIODS]
+
+
+def load_cached_weather_data(max_age=None):
+    """Processed season frames, memory-mapped from the shared on-disk cache.
+
+    Returns a dict with the "hourly" wide frame, the "latest" last-value
+    index, the "heatmap" new-snow density grid, the "qc" counts and one
+    rollup table per ROLLUP_PERIODS entry, or None if any is missing or older
+    than max_age seconds. See add_snapshot_lookups() for the other entries.
+    """
+    frames = {
+        kind: read_processed_frame(
+            STATION_TRIPLETS, ELEMENTS, SEASON_START, kind=kind, max_age=max_age
+        )
+        for kind in SNAPSHOT_KINDS
+    }
+    if any(frame is None for frame in frames.values()):
+        return None
+    return add_snapshot_lookups(frames)
+
+
+def load_season_normals():
+    """Normals written by snow_backfill.py, or None if it has not run"""
+    return read_season_normals()
+
+
+def add_snapshot_lookups(frames):
+    """Complete a snapshot with the data pages look things up in.
+
+    Adds "normals" (the season-over-season normals, or None before the first
+    backfill) and "index", a TimeRangeIndex per time-keyed frame so pages
+    slice station windows instead of filtering whole frames.
+    """
+    frames["normals"] = load_season_normals()
+    frames["index"] = {
+        kind: TimeRangeIndex(frames[kind]) for kind in ["hourly", *ROLLUP_PERIODS]
+    }
+    return frames
+
+
+def snapshot_version():
+    """Modification times of the snapshot's files; changes whenever one is rewritten.
+
+    One entry per SNAPSHOT_KINDS entry (None while missing), then the
+    normals, so a finished backfill also counts as a new version.
+    """
+    paths = [
+        processed_frame_path(STATION_TRIPLETS, ELEMENTS, SEASON_START, kind)
+        for kind in SNAPSHOT_KINDS
+    ]
+    paths.append(season_normals_path())
+    return tuple(path.stat().st_mtime_ns if path.exists() else None for path in paths)
@@ -0,0 +1,258 @@
+"""Persistent local storage for SNOTEL observations"""
+
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import polars as pl
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+# Local directory for persisted SNOTEL data. Override with SNOW_DATA_DIR.
+DATA_DIR = Path(os.environ.get("SNOW_DATA_DIR", Path(__file__).parent / ".snow_data"))
+
+# Element codes the store can hold. Add a code here before requesting it;
+# casting an unknown code to the Enum fails loudly.
+ELEMENT_CODES = pl.Enum(["SNWD", "SNDN", "SNRR", "SWE", "WTEQ", "TOBS"])
+
+# Long-format schema of a single hourly observation. Stations and elements
+# are dictionary-encoded and readings are Float32: SNOTEL reports at most two
+# decimals, well within single precision.
+OBSERVATION_SCHEMA = {
+    "stationTriplet": pl.Categorical,
+    "elementCode": ELEMENT_CODES,
+    "date": pl.Datetime("us"),
+    "value": pl.Float32,
+}
+
+# Bumped whenever the layout of the processed frames changes, so caches
+# written by an older version are rebuilt instead of mixed with new frames
+PROCESSED_SCHEMA_VERSION = 4
+
+# Re-fetch this many hours before the newest stored observation so that
+# late revisions from the station are merged into the history.
+REFETCH_OVERLAP = timedelta(hours=6)
+
+# Elements whose newest reading is older than this, relative to the station's
+# newest stored hour, have stopped reporting (SNDN after melt-out, SNRR
+# dropouts) and no longer hold back the incremental fetch.
+STALLED_ELEMENT_AGE = timedelta(days=1)
+
+
+def observations_path(station_triplet):
+    """Path of the observation history file for a station"""
+    return DATA_DIR / "observations" / f"{station_triplet.replace(':', '_')}.parquet"
+
+
+def empty_observations():
+    """Empty observation frame with the canonical schema"""
+    return pl.DataFrame(schema=OBSERVATION_SCHEMA)
+
+
+def load_observations(station_triplet):
+    """Load the stored observation history for a station (empty if none yet)"""
+    path = observations_path(station_triplet)
+    if not path.exists():
+        return empty_observations()
+    return pl.read_parquet(path).cast(OBSERVATION_SCHEMA)
+
+
+def save_observations(df, station_triplet):
+    """Atomically replace the stored observation history for a station"""
+    path = observations_path(station_triplet)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    df.write_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def latest_observation_dates(df):
+    """Newest observation timestamp per element, ignoring null readings"""
+    latest = (
+        df.filter(pl.col("value").is_not_null())
+        .group_by("elementCode")
+        .agg(pl.col("date").max())
+    )
+    return dict(latest.iter_rows())
+
+
+def delta_begin_date(df, season_start):
+    """Begin date for an incremental fetch.
+
+    Starts REFETCH_OVERLAP before the oldest of the per-element newest
+    observations, so every element is caught up. Elements that stopped
+    reporting more than STALLED_ELEMENT_AGE before the newest stored hour
+    are left out, so one dead sensor does not re-download the weeks since
+    it went quiet on every refresh. Falls back to the season start when
+    nothing is stored yet.
+    """
+    season_start = datetime.fromisoformat(str(season_start))
+    latest = latest_observation_dates(df.filter(pl.col("date") >= season_start))
+    if not latest:
+        return season_start
+    newest = max(latest.values())
+    reporting = [
+        date for date in latest.values() if date >= newest - STALLED_ELEMENT_AGE
+    ]
+    return max(min(reporting) - REFETCH_OVERLAP, season_start)
+
+
+def merge_observations(stored, new):
+    """Merge newly fetched rows into the stored history.
+
+    Rows for the same station, element and hour are replaced by the newer
+    fetch so revised values win.
+    """
+    return (
+        pl.concat([stored, new.cast(OBSERVATION_SCHEMA)])
+        .unique(
+            subset=["stationTriplet", "elementCode", "date"],
+            keep="last",
+            maintain_order=True,
+        )
+        .sort(["stationTriplet", "elementCode", "date"])
+    )
+
+
+def history_partition_path(station_triplet, water_year):
+    """Path of a station's backfilled observations for one water year.
+
+    Partitions use hive-style directory names (station=/water_year=), so a
+    scan of the history directory can prune by either key.
+    """
+    return (
+        DATA_DIR
+        / "history"
+        / f"station={station_triplet.replace(':', '_')}"
+        / f"water_year={water_year}"
+        / "observations.parquet"
+    )
+
+
+def save_history_partition(df, station_triplet, water_year):
+    """Atomically write one station and water year of backfilled observations.
+
+    A partition file only ever appears complete, so its existence marks the
+    chunk as done when an interrupted backfill resumes.
+    """
+    path = history_partition_path(station_triplet, water_year)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    df.cast(OBSERVATION_SCHEMA).write_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def scan_history():
+    """Lazily scan every backfilled partition (None when there are none).
+
+    Rows keep the observation schema plus an Int32 water_year column taken
+    from the partition path.
+    """
+    root = DATA_DIR / "history"
+    if not any(root.glob("*/*/observations.parquet")):
+        return None
+    return (
+        pl.scan_parquet(
+            root / "*" / "*" / "observations.parquet",
+            hive_partitioning=True,
+            hive_schema={"station": pl.String, "water_year": pl.Int32},
+        )
+        .drop("station")
+        .cast(OBSERVATION_SCHEMA)
+    )
+
+
+def season_normals_path():
+    """Path of the season-over-season normals built from the backfill"""
+    return DATA_DIR / "history" / "normals.arrow"
+
+
+def save_season_normals(df):
+    """Atomically write the normals table (uncompressed, for memory mapping)"""
+    path = season_normals_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    df.write_ipc(tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def read_season_normals():
+    """Memory-map the normals table (None until a backfill ran)"""
+    path = season_normals_path()
+    if not path.exists():
+        return None
+    return pl.read_ipc(path, memory_map=True, rechunk=False)
+
+
+@contextmanager
+def refresh_lock():
+    """Hold the data directory's exclusive refresh lock (blocking).
+
+    Serializes refreshes across every server process sharing DATA_DIR, so
+    the API is hit and the stored files are rewritten by one process at a
+    time. The lock is released when its holder exits, even on a crash.
+    """
+    path = DATA_DIR / "refresh.lock"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def processed_frame_path(station_triplets, elements, season_start, kind="hourly"):
+    """Path of a processed frame for a station set, element set and season.
+
+    `kind` separates the hourly wide frame from its rollup tables. Frames are
+    uncompressed Arrow IPC files so every process can memory-map them.
+    """
+    station_key = "+".join(sorted(t.replace(":", "_") for t in station_triplets))
+    element_key = "-".join(sorted(elements))
+    name = (
+        f"{station_key}__{element_key}__{season_start}__{kind}"
+        f"__v{PROCESSED_SCHEMA_VERSION}"
+    )
+    return DATA_DIR / "processed" / f"{name}.arrow"
+
+
+def save_processed_frame(df, station_triplets, elements, season_start, kind="hourly"):
+    """Atomically write a processed frame to the shared columnar cache.
+
+    Readers that mapped the previous file keep their view of it; the next
+    scan maps the new one.
+    """
+    path = processed_frame_path(station_triplets, elements, season_start, kind)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    df.write_ipc(tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def read_processed_frame(
+    station_triplets, elements, season_start, kind="hourly", max_age=None
+):
+    """Memory-map a cached processed frame.
+
+    The uncompressed file is mapped read-only and the frame's columns point
+    into the mapping rather than a private copy, so processes reading the
+    same frame share one copy in the page cache. Collecting a scan_ipc() of
+    the file would copy it instead. Returns None when no cache exists or it
+    is older than max_age seconds.
+    """
+    path = processed_frame_path(station_triplets, elements, season_start, kind)
+    try:
+        age = time.time() - path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if max_age is not None and age > max_age:
+        return None
+    return pl.read_ipc(path, memory_map=True, rechunk=False)
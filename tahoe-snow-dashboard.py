@@ -1,8 +1,52 @@
+import logging
+import threading
 import streamlit as st
 import requests
 import polars as pl
 import altair as alt
-from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from functools import partial
+
+from awdb_client import AWDBClient
+from snow_pipeline import (
+    HEATMAP_DAYS,
+    MIN_ACCUMULATION_INCHES,
+    QC_MAX_GAP_HOURS,
+    QC_MEDIAN_WINDOW,
+    ROLLUP_PERIODS,
+    TimeRangeIndex,
+    build_heatmap_matrix,
+    build_latest_index,
+    build_rollup,
+    downsample_min_max,
+    get_day_over_day_changes,
+    get_latest_metrics,
+    heatmap_cells,
+    process_weather_data_with_qc,
+    season_vs_normal,
+    update_heatmap_matrix,
+    update_latest_index,
+    update_rollup,
+)
+from snow_refresher import BackgroundRefresher, current_refresh_slot
+from snow_snapshot import (
+    ELEMENTS,
+    SEASON_START,
+    STATION_TRIPLETS,
+    add_snapshot_lookups,
+    load_cached_weather_data,
+)
+from snow_store import (
+    delta_begin_date,
+    empty_observations,
+    load_observations,
+    merge_observations,
+    save_observations,
+    refresh_lock,
+    save_processed_frame,
+    read_processed_frame,
+)
 
 # Page configuration
 st.set_page_config(
@@ -316,27 +360,28 @@ st.markdown(
 )
 
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def fetch_weather_data():
-    """Fetch weather data from USDA AWDB API with error handling"""
-    duration = "HOURLY"
-    elements = "SNWD%2CSNDN%2CSNRR%2CSWE%2CWTEQ%2CTOBS"
-    start_date = "2025-10-01"
+# Display names for known SNOTEL stations; unknown triplets show as-is
+STATION_NAMES = {"784:CA:SNTL": "Palisades Tahoe"}
 
-    url = f"https://wcc.sc.egov.usda.gov/awdbRestApi/services/v1/data?stationTriplets=784%3ACA%3ASNTL&elements={elements}&duration={duration}&beginDate={start_date}&returnFlags=false&returnOriginalValues=false&returnSuspectData=false"
+logger = logging.getLogger(__name__)
 
-    try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
+# Upper bound on simultaneous AWDB requests. Up to this many stations are
+# all fetched at once, so a refresh takes about as long as the slowest one.
+MAX_CONCURRENT_FETCHES = 16
 
-        # Validate response structure
-        if not isinstance(data, list) or len(data) == 0:
-            raise ValueError("Invalid API response structure")
-        if "data" not in data[0]:
-            raise ValueError("Missing 'data' field in API response")
 
-        return data
+@st.cache_resource
+def get_awdb_client():
+    """One pooled AWDB client shared by every session in this process"""
+    return AWDBClient(max_connections=MAX_CONCURRENT_FETCHES)
+
+
+def fetch_weather_data(station_triplet, begin_date=SEASON_START, stream=False):
+    """Fetch weather data from USDA AWDB API with error handling"""
+    try:
+        return get_awdb_client().get_data(
+            station_triplet, ELEMENTS, begin_date, stream=stream
+        )
     except requests.exceptions.Timeout:
         raise Exception("API request timed out. Please try again.")
     except requests.exceptions.ConnectionError:
@@ -347,79 +392,159 @@ def fetch_weather_data():
         raise Exception(f"Invalid API response: {str(e)}")
 
 
-@st.cache_data(ttl=3600)
-def process_weather_data(weather_data_json):
-    """Process raw weather data into a structured dataframe"""
-    weather_data_list = []
-
-    for station in weather_data_json:
-        station_triplet = station["stationTriplet"]
-        for measurement in station["data"]:
-            element_code = measurement["stationElement"]["elementCode"]
-            for val in measurement["values"]:
-                weather_data_list.append(
-                    {
-                        "stationTriplet": station_triplet,
-                        "elementCode": element_code,
-                        "date": val["date"],
-                        "value": val["value"],
-                    }
+def refresh_station_observations(station_triplet):
+    """Merge hours newer than the last stored observation into a station's history.
+
+    Only the delta since the newest stored hour (minus a small overlap for
+    late revisions) is downloaded, so refresh cost tracks the number of new
+    hours rather than the length of the season.
+    """
+    stored = load_observations(station_triplet)
+    begin_date = delta_begin_date(stored, SEASON_START)
+    # A cold store pulls the whole season, so stream it
+    new_observations = fetch_weather_data(
+        station_triplet, begin_date, stream=stored.is_empty()
+    )
+
+    observations = merge_observations(stored, new_observations)
+    save_observations(observations, station_triplet)
+    season_observations = observations.filter(
+        pl.col("date") >= datetime.fromisoformat(SEASON_START)
+    )
+    return season_observations, new_observations
+
+
+def stored_season_observations(station_triplet):
+    """A station's last good season from its history file, fetching nothing"""
+    season_observations = load_observations(station_triplet).filter(
+        pl.col("date") >= datetime.fromisoformat(SEASON_START)
+    )
+    return season_observations, empty_observations()
+
+
+def load_weather_observations(station_triplets):
+    """Refresh all stations concurrently and combine their observations.
+
+    Returns the season's observations and the rows fetched by this refresh.
+    A station whose refresh fails is logged and keeps its last stored
+    history, so one bad station does not hold back the others; the refresh
+    only fails if every station does.
+    """
+    results, errors = {}, []
+    workers = min(len(station_triplets), MAX_CONCURRENT_FETCHES)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(refresh_station_observations, station_triplet): (
+                station_triplet
+            )
+            for station_triplet in station_triplets
+        }
+        for future in as_completed(futures):
+            station_triplet = futures[future]
+            try:
+                results[station_triplet] = future.result()
+            except Exception as e:
+                logger.exception(
+                    "Refresh of %s failed; keeping its stored data", station_triplet
                 )
+                errors.append(e)
+                results[station_triplet] = stored_season_observations(station_triplet)
+    if len(errors) == len(station_triplets):
+        raise errors[0]
 
-    weather_data_df = pl.DataFrame(weather_data_list)
-    weather_data_df = weather_data_df.with_columns(
-        [
-            pl.col("stationTriplet").cast(pl.Categorical),
-            pl.col("elementCode").cast(pl.Categorical),
-            pl.col("date").str.strptime(pl.Datetime, "%Y-%m-%d %H:%M"),
-        ]
+    station_frames, new_frames = zip(
+        *(results[station_triplet] for station_triplet in station_triplets)
     )
+    return pl.concat(station_frames), pl.concat(new_frames)
 
-    # Pivot to get elements as columns
-    weather_data_df = weather_data_df.pivot(on="elementCode", values="value")
 
-    # Sort by date to ensure diff() works correctly
-    weather_data_df = weather_data_df.sort("date")
+def refresh_weather_data():
+    """Refresh observations from the API, then reprocess and cache the frames.
 
-    # Bulk snowpack density: ρ_s = (1000 × WTEQ) / SNWD in kg/m³
-    # Both WTEQ and SNWD are hourly readings in inches
-    weather_data_df = weather_data_df.with_columns(
-        pl.when(
-            (pl.col("WTEQ").is_not_null())
-            & (pl.col("SNWD").is_not_null())
-            & (pl.col("SNWD") > 0)
-        )
-        .then(1000.0 * pl.col("WTEQ") / pl.col("SNWD"))
-        .otherwise(None)
-        .alias("snow_density")
-    )
-
-    # New-snow (layer) density: density of the snow that fell in the last hour.
-    # Computed from hour-over-hour deltas in SNWD and WTEQ.
-    # Only populated when accumulation >= MIN_ACCUMULATION_INCHES and WTEQ is also rising,
-    # which filters out settlement, melt, and sensor noise.
-    weather_data_df = weather_data_df.with_columns(
-        [
-            pl.col("SNWD").diff(1).alias("delta_SNWD"),
-            pl.col("WTEQ").diff(1).alias("delta_WTEQ"),
-        ]
+    Only one server process refreshes at a time. Frames written since the
+    current refresh slot began already hold this hour's report (another
+    process refreshed it), so they are mapped instead of fetched again.
+    Older frames are refreshed, including ones this process wrote itself on
+    a catch-up refresh before the slot.
+    """
+    with refresh_lock():
+        now = datetime.now()
+        slot_age = (now - current_refresh_slot(now)).total_seconds()
+        cached = load_cached_weather_data(max_age=slot_age)
+        if cached is not None:
+            return cached
+        return fetch_and_process_weather_data()
+
+
+def fetch_and_process_weather_data():
+    """Fetch new observations, then reprocess and cache the frames.
+
+    Rollups are only re-aggregated for periods the refresh touched, and the
+    last-value index and heatmap grid only fold in the changed rows (plus
+    whatever an interrupted earlier refresh stored but never processed). The
+    new frames are written back to disk for the other processes.
+    """
+    observations, new_observations = load_weather_observations(STATION_TRIPLETS)
+    changed_since = new_observations.get_column("date").min()
+    hourly, qc_counts = process_weather_data_with_qc(observations)
+    frames = {"hourly": hourly, "qc": qc_counts}
+
+    previous_index = read_processed_frame(
+        STATION_TRIPLETS, ELEMENTS, SEASON_START, kind="latest"
     )
-    weather_data_df = weather_data_df.with_columns(
-        pl.when(
-            (pl.col("delta_SNWD") >= MIN_ACCUMULATION_INCHES)
-            & (pl.col("delta_WTEQ") > 0)
+    if previous_index is None:
+        frames["latest"] = build_latest_index(observations)
+    else:
+        frames["latest"] = update_latest_index(
+            previous_index, observations, changed_since
         )
-        .then(1000.0 * pl.col("delta_WTEQ") / pl.col("delta_SNWD"))
-        .otherwise(None)
-        .alias("new_snow_density")
+    previous_heatmap = read_processed_frame(
+        STATION_TRIPLETS, ELEMENTS, SEASON_START, kind="heatmap"
     )
+    if previous_heatmap is None:
+        frames["heatmap"] = build_heatmap_matrix(TimeRangeIndex(hourly))
+    else:
+        frames["heatmap"] = update_heatmap_matrix(
+            previous_heatmap, TimeRangeIndex(hourly), changed_since
+        )
+    for kind, every in ROLLUP_PERIODS.items():
+        previous = read_processed_frame(
+            STATION_TRIPLETS, ELEMENTS, SEASON_START, kind=kind
+        )
+        if previous is None:
+            frames[kind] = build_rollup(frames["hourly"], every)
+        else:
+            frames[kind] = update_rollup(
+                previous, frames["hourly"], every, changed_since
+            )
 
-    return weather_data_df
+    for kind, frame in frames.items():
+        save_processed_frame(frame, STATION_TRIPLETS, ELEMENTS, SEASON_START, kind=kind)
+    return add_snapshot_lookups(frames)
 
 
-# Minimum hourly snow depth increase (inches) to count as real accumulation.
-# Filters out sensor noise and minor settlement when computing new-snow density.
-MIN_ACCUMULATION_INCHES = 0.5
+@st.cache_resource
+def get_weather_refresher():
+    """Start one background refresher per server process.
+
+    Pages render the last good snapshot (stale cached frames included) while
+    new data is pulled shortly after each hourly SNOTEL report.
+    """
+    return BackgroundRefresher(load_cached_weather_data, refresh_weather_data).start()
+
+
+# Metric cards note values older than this relative to the latest update
+STALE_AFTER = timedelta(hours=2)
+
+# Metric card comparison windows (see COMPARISON_WINDOWS in snow_pipeline)
+COMPARISON_LABELS = {
+    "day": "vs yesterday",
+    "24h": "vs 24h ago",
+    "week": "vs last week",
+}
+
+# Upper bound on rows sent to the browser per chart series
+MAX_CHART_POINTS = 1000
 
 # Chart styling helpers
 CHART_CONFIG = {
@@ -474,125 +599,644 @@ def configure_chart(chart, title="", height=400, legend=False, show_title=False)
     return config
 
 
-def render_metric_card(value, unit, label, change_percent=None, change_direction=None):
+def get_station_series(weather_data, station_triplet, *columns):
+    """One station's hourly rows, with only `date` and the given columns"""
+    return (
+        weather_data["index"]["hourly"]
+        .station(station_triplet)
+        .select("date", *columns)
+    )
+
+
+def get_chart_points(weather_data, station_triplet, column):
+    """Downsampled time series of one hourly column for charting"""
+    return downsample_min_max(
+        get_station_series(weather_data, station_triplet, column),
+        column,
+        MAX_CHART_POINTS,
+    )
+
+
+def build_snow_depth_chart(weather_data, station_triplet):
+    """Snow depth area chart; returns (chart, named datasets)"""
+    # Base chart with x-axis encoding
+    base = alt.Chart(alt.NamedData("snow_depth")).encode(
+        x=alt.X("date:T", title="", axis=create_axis(grid=False))
+    )
+
+    # Snow depth area chart
+    snow_area = base.mark_area(
+        color="lightblue", interpolate="step-after", line=True
+    ).encode(y=alt.Y("SNWD:Q", title="Snow Depth (Inches)", axis=create_axis()))
+
+    return configure_chart(snow_area), {
+        "snow_depth": get_chart_points(weather_data, station_triplet, "SNWD")
+    }
+
+
+def build_temperature_chart(weather_data, station_triplet):
+    """Temperature line with a freezing point reference; returns (chart, named datasets)"""
+    # Temperature Chart
+    temp_line = (
+        alt.Chart(alt.NamedData("temperature"))
+        .mark_line(color="#f59e0b", size=2, point=False)
+        .encode(
+            x=alt.X("date:T", title="", axis=create_axis(grid=False)),
+            y=alt.Y("TOBS:Q", title="Temperature (°F)", axis=create_axis()),
+            tooltip=["date:T", alt.Tooltip("TOBS:Q", format=".1f")],
+            color=alt.value("#f59e0b"),
+        )
+    )
+
+    # Freezing point reference line
+    freezing_line = (
+        alt.Chart(alt.NamedData("freezing_point"))
+        .mark_rule(strokeDash=[5, 5], color="lightblue", size=2)
+        .encode(y="freezing_point:Q", color=alt.value("lightblue"))
+    )
+
+    # Legend layer
+    legend_data = pl.DataFrame(
+        {
+            "legend": ["Observed Temperature", "Freezing Point (32°F)"],
+            "value": [0, 0],
+        }
+    )
+    legend_layer = (
+        alt.Chart(alt.NamedData("legend"))
+        .mark_point(opacity=0)
+        .encode(
+            color=alt.Color(
+                "legend:N",
+                scale=alt.Scale(
+                    domain=["Observed Temperature", "Freezing Point (32°F)"],
+                    range=["#f59e0b", "lightblue"],
+                ),
+                legend=alt.Legend(title="Legend", titleFontSize=12, labelFontSize=11),
+            )
+        )
+    )
+
+    temp_chart = configure_chart(
+        temp_line + freezing_line + legend_layer,
+        legend=True,
+    )
+    return temp_chart, {
+        "temperature": get_chart_points(weather_data, station_triplet, "TOBS"),
+        "freezing_point": pl.DataFrame({"freezing_point": [32]}),
+        "legend": legend_data,
+    }
+
+
+def build_swe_chart(weather_data, station_triplet):
+    """Snow water equivalent area chart; returns (chart, named datasets)"""
+    swe_area = (
+        alt.Chart(alt.NamedData("swe"))
+        .mark_area(color="#06b6d4", opacity=0.3, interpolate="step-after", line=True)
+        .encode(
+            x=alt.X("date:T", title="", axis=create_axis(grid=False)),
+            y=alt.Y("WTEQ:Q", title="SWE (inches)", axis=create_axis()),
+            tooltip=["date:T", alt.Tooltip("WTEQ:Q", format=".2f")],
+        )
+    )
+    return configure_chart(swe_area), {
+        "swe": get_chart_points(weather_data, station_triplet, "WTEQ")
+    }
+
+
+def build_density_chart(weather_data, station_triplet):
+    """Bulk density with its 24h rolling mean and overall mean; returns (chart, named datasets)"""
+    # Filter to rows with valid bulk snow_density
+    valid_density_df = get_station_series(
+        weather_data, station_triplet, "snow_density", "snow_density_mean_24h"
+    ).filter(pl.col("snow_density").is_not_null())
+
+    # Snow density area
+    density_area = (
+        alt.Chart(alt.NamedData("density"))
+        .mark_area(interpolate="basis", opacity=0.6)
+        .encode(
+            x=alt.X("date:T", title="", axis=create_axis(grid=False)),
+            y=alt.Y(
+                "snow_density:Q",
+                title="Snow Density (WTEQ / SNWD)",
+                axis=create_axis(),
+            ),
+            color=alt.value("#efe6ff"),
+            tooltip=["date:T", alt.Tooltip("snow_density:Q", format=".3f")],
+        )
+    )
+
+    # 24-hour rolling mean, precomputed in process_weather_data()
+    rolling_mean = (
+        alt.Chart(alt.NamedData("rolling_mean"))
+        .mark_line(color="#7c3aed", size=2)
+        .encode(
+            x=alt.X("date:T", title="", axis=create_axis(grid=False)),
+            y=alt.Y("snow_density_mean_24h:Q"),
+            color=alt.value("#7c3aed"),
+        )
+    )
+
+    # Overall mean reference line
+    mean_rule = (
+        alt.Chart(alt.NamedData("mean_density"))
+        .mark_rule(color="#94a3b8", strokeDash=[4, 4], size=2)
+        .encode(y="mean_density:Q", color=alt.value("#94a3b8"))
+    )
+
+    # Legend layer
+    legend_data = pl.DataFrame(
+        {
+            "legend": ["Snow Density", "24-Hour Rolling Mean", "Overall Mean"],
+            "value": [0, 0, 0],
+        }
+    )
+    legend_layer = (
+        alt.Chart(alt.NamedData("legend"))
+        .mark_point(opacity=0)
+        .encode(
+            color=alt.Color(
+                "legend:N",
+                scale=alt.Scale(
+                    domain=[
+                        "Snow Density",
+                        "24-Hour Rolling Mean",
+                        "Overall Mean",
+                    ],
+                    range=["#efe6ff", "#7c3aed", "#94a3b8"],
+                ),
+                legend=alt.Legend(title="Legend", titleFontSize=12, labelFontSize=11),
+            )
+        )
+    )
+
+    density_chart = configure_chart(
+        density_area + rolling_mean + mean_rule + legend_layer,
+        height=420,
+        legend=True,
+    )
+    return density_chart, {
+        "density": downsample_min_max(
+            valid_density_df, "snow_density", MAX_CHART_POINTS
+        ),
+        "rolling_mean": downsample_min_max(
+            valid_density_df, "snow_density_mean_24h", MAX_CHART_POINTS
+        ),
+        "mean_density": valid_density_df.select(
+            pl.col("snow_density").mean().alias("mean_density")
+        ),
+        "legend": legend_data,
+    }
+
+
+def build_heatmap_chart(weather_data, station_triplet):
+    """New-snow density by day and hour; returns (chart, named datasets).
+
+    Reads the station's precomputed day x hour grid, so the payload is
+    bounded by HEATMAP_DAYS regardless of history. Returns None when the
+    station has no accumulation hours in that window.
+    """
+    new_snow_df = heatmap_cells(
+        weather_data["heatmap"].filter(pl.col("stationTriplet") == station_triplet)
+    )
+    if new_snow_df.height == 0:
+        return None
+
+    heatmap_data = new_snow_df.select(
+        pl.col("date").dt.strftime("%m-%d").alias("day"),
+        pl.col("date").dt.hour().alias("hour"),
+        "new_snow_density",
+    )
+
+    heatmap = (
+        alt.Chart(alt.NamedData("heatmap"))
+        .mark_rect()
+        .encode(
+            x=alt.X(
+                "day:O",
+                title="Date",
+                axis=create_axis(grid=False),
+            ),
+            y=alt.Y(
+                "hour:O",
+                title="Hour of Day",
+                axis=create_axis(grid=False),
+                sort="ascending",
+            ),
+            color=alt.Color(
+                "new_snow_density:Q",
+                scale=alt.Scale(
+                    scheme="blues",
+                    domain=[0, 150],
+                ),
+                title="Density (kg/m³)",
+            ),
+            tooltip=[
+                alt.Tooltip("day:O", title="Date"),
+                alt.Tooltip("hour:O", title="Hour"),
+                alt.Tooltip(
+                    "new_snow_density:Q",
+                    title="New Snow Density",
+                    format=".1f",
+                ),
+            ],
+        )
+    )
+    return configure_chart(heatmap, height=320), {"heatmap": heatmap_data}
+
+
+def build_normals_chart(weather_data, station_triplet, element, title):
+    """This season's daily mean over past seasons' percentile bands.
+
+    Returns (chart, named datasets), or None without normals for the station.
+    """
+    if weather_data["normals"] is None:
+        return None
+    overlay = season_vs_normal(
+        weather_data["index"]["daily"],
+        weather_data["normals"],
+        station_triplet,
+        element,
+    )
+    if overlay is None:
+        return None
+
+    # 10th-90th percentile band and median of past seasons
+    band = (
+        alt.Chart(alt.NamedData("normals"))
+        .mark_area(color="#94a3b8", opacity=0.25)
+        .encode(
+            x=alt.X("date:T", title="", axis=create_axis(grid=False)),
+            y=alt.Y("p10:Q", title=title, axis=create_axis()),
+            y2="p90:Q",
+            tooltip=[
+                alt.Tooltip("date:T", format="%b %d"),
+                alt.Tooltip("p10:Q", title="10th percentile", format=".1f"),
+                alt.Tooltip("p50:Q", title="Median", format=".1f"),
+                alt.Tooltip("p90:Q", title="90th percentile", format=".1f"),
+            ],
+        )
+    )
+    median = (
+        alt.Chart(alt.NamedData("normals"))
+        .mark_line(color="#64748b", strokeDash=[4, 4], size=2)
+        .encode(x="date:T", y="p50:Q")
+    )
+
+    # This season so far
+    season = (
+        alt.Chart(alt.NamedData("season"))
+        .mark_line(color="#3b82f6", size=2)
+        .encode(
+            x="date:T",
+            y="value:Q",
+            tooltip=[
+                alt.Tooltip("date:T", format="%b %d"),
+                alt.Tooltip("value:Q", title="This season", format=".1f"),
+            ],
+        )
+    )
+    return configure_chart(band + median + season), {
+        "normals": overlay.select("date", "p10", "p50", "p90"),
+        "season": overlay.select("date", "value").drop_nulls(),
+    }
+
+
+CHART_BUILDERS = {
+    "snow_depth": build_snow_depth_chart,
+    "temperature": build_temperature_chart,
+    "swe": build_swe_chart,
+    "density": build_density_chart,
+    "heatmap": build_heatmap_chart,
+    "snow_depth_normals": partial(
+        build_normals_chart, element="SNWD", title="Snow Depth (inches)"
+    ),
+    "swe_normals": partial(build_normals_chart, element="WTEQ", title="SWE (inches)"),
+}
+
+
+@st.cache_resource
+def get_altair_lock():
+    """Process-wide lock around Altair's global theme switch"""
+    return threading.Lock()
+
+
+@st.cache_resource(max_entries=128)
+def get_chart_spec(_weather_data, fingerprint, chart_name):
+    """Finished Vega-Lite spec for one chart, built once per data version.
+
+    Keyed by the data fingerprint and chart name and shared by every session,
+    so reruns skip preparing, building, validating and serializing charts;
+    a chart's data is only prepared the first time it is shown. Chart rows
+    live in named datasets rather than in the JSON spec. Returns None
+    when there is nothing to chart. Callers must not mutate the result.
+    """
+    built = CHART_BUILDERS[chart_name](_weather_data, fingerprint[0])
+    if built is None:
+        return None
+    chart, datasets = built
+    # Like st.altair_chart, drop Altair's default view size so the chart
+    # fills its container
+    with get_altair_lock(), alt.theme.enable("none"):
+        spec = chart.to_dict()
+    # st.vega_lite_chart serializes the frames in "datasets" to Arrow itself
+    spec["datasets"] = dict(datasets)
+    return spec
+
+
+def render_metric_card(
+    value,
+    unit,
+    label,
+    change_percent=None,
+    change_direction=None,
+    stale_for=None,
+    comparison_label="vs yesterday",
+):
     """Helper to render metric cards with consistent styling and percent change"""
     display_value = f"{value}{unit}" if value is not None else "N/A"
 
+    # Flag values carried forward from an older reading
+    stale_html = ""
+    if stale_for is not None and stale_for >= STALE_AFTER:
+        hours = stale_for.total_seconds() / 3600
+        stale_html = f'<p style="font-size: 0.75rem; color: #9CA3AF; margin-top: 0.5rem;">Last reading {hours:.0f}h before update</p>'
+
     # Build change indicator HTML
     change_html = ""
     if change_percent is not None and change_direction is not None:
         # If change is 0, show gray text with no arrow
         if change_percent == 0:
-            change_html = '<p style="font-size: 0.75rem; color: #9CA3AF; margin-top: 0.5rem; font-weight: 600;">0.0% vs yesterday</p>'
+            change_html = f'<p style="font-size: 0.75rem; color: #9CA3AF; margin-top: 0.5rem; font-weight: 600;">0.0% {comparison_label}</p>'
         else:
             arrow = "↑" if change_direction == "up" else "↓"
             color = (
                 "#10B981" if change_direction == "up" else "#EF4444"
             )  # Green up, Red down
-            change_html = f'<p style="font-size: 0.75rem; color: {color}; margin-top: 0.5rem; font-weight: 600;">{arrow} {abs(change_percent):.1f}% vs yesterday</p>'
+            change_html = f'<p style="font-size: 0.75rem; color: {color}; margin-top: 0.5rem; font-weight: 600;">{arrow} {abs(change_percent):.1f}% {comparison_label}</p>'
 
     return f"""
                 <div class="metric-card">
                     <p class="metric-value">{display_value}</p>
                     <p class="metric-label">{label}</p>
                     {change_html}
+                    {stale_html}
                 </div>
             """
 
 
-def get_latest_metrics(df):
-    """Get the latest values for each metric with fallback for missing data"""
-    if df.is_empty():
-        raise ValueError("No data available")
+def get_station_label(station_triplet):
+    """Display label for a station, e.g. 'Palisades Tahoe (784:CA:SNTL)'"""
+    name = STATION_NAMES.get(station_triplet)
+    return f"{name} ({station_triplet})" if name else station_triplet
 
-    metrics = {}
-    latest_date = df.select(pl.col("date").max()).item()
 
-    # Get latest values for each element
-    latest_row = df.filter(pl.col("date") == latest_date).row(0, named=True)
+def get_station_comparison(latest_index):
+    """Latest reading of each key metric per station, for side-by-side viewing"""
+    return (
+        latest_index.filter(pl.col("elementCode").is_in(["SNWD", "TOBS", "WTEQ"]))
+        .pivot(on="elementCode", index="stationTriplet", values="value")
+        .join(
+            latest_index.group_by("stationTriplet").agg(
+                pl.col("date").max().alias("Last Reading")
+            ),
+            on="stationTriplet",
+        )
+        .select(
+            pl.col("stationTriplet")
+            .map_elements(get_station_label, return_dtype=pl.String)
+            .alias("Station"),
+            "Last Reading",
+            pl.col("SNWD").alias("Snow Depth (in)"),
+            pl.col("TOBS").alias("Temperature (°F)"),
+            pl.col("WTEQ").alias("SWE (in)"),
+        )
+    )
 
-    for element in ["SNWD", "TOBS", "WTEQ"]:
-        value = latest_row.get(element)
-        if value is not None:
-            metrics[element] = value
-        else:
-            # Fallback to most recent available value
-            available = df.select(element).drop_nulls()
-            if available.height > 0:
-                metrics[element] = available.item(-1, 0)
-            else:
-                metrics[element] = None
-
-    return metrics, latest_date
-
-
-def get_day_over_day_changes(df):
-    """Calculate percent change between today and yesterday using average values for key metrics"""
-    if df.is_empty():
-        return {}
-
-    # Get today's date (most recent)
-    latest_date = df.select(pl.col("date").max()).item()
-    today = latest_date.date()
-    yesterday = today - timedelta(days=1)
-
-    # Filter data for each day and compute daily averages
-    today_data = df.filter(pl.col("date").cast(pl.Date) == today).select(
-        pl.col("SNWD").mean().alias("snwd"),
-        pl.col("TOBS").mean().alias("tobs"),
-        pl.col("WTEQ").mean().alias("wteq"),
-    )
-
-    yesterday_data = df.filter(pl.col("date").cast(pl.Date) == yesterday).select(
-        pl.col("SNWD").mean().alias("snwd"),
-        pl.col("TOBS").mean().alias("tobs"),
-        pl.col("WTEQ").mean().alias("wteq"),
-    )
-
-    changes = {}
-
-    # Only calculate changes if both days have data
-    if today_data.height > 0 and yesterday_data.height > 0:
-        today_row = today_data.row(0, named=True)
-        yesterday_row = yesterday_data.row(0, named=True)
-
-        # Snow Depth change
-        if (
-            yesterday_row.get("snwd")
-            and today_row.get("snwd")
-            and yesterday_row["snwd"] != 0
-        ):
-            snwd_change = (
-                (today_row["snwd"] - yesterday_row["snwd"]) / yesterday_row["snwd"]
-            ) * 100
-            changes["snwd_percent"] = snwd_change
-            changes["snwd_direction"] = "up" if snwd_change >= 0 else "down"
-
-        # Temperature change
-        if (
-            yesterday_row.get("tobs")
-            and today_row.get("tobs")
-            and yesterday_row["tobs"] != 0
-        ):
-            tobs_change = (
-                (today_row["tobs"] - yesterday_row["tobs"]) / abs(yesterday_row["tobs"])
-            ) * 100
-            changes["tobs_percent"] = tobs_change
-            changes["tobs_direction"] = "up" if tobs_change >= 0 else "down"
-
-        # SWE change
-        if (
-            yesterday_row.get("wteq")
-            and today_row.get("wteq")
-            and yesterday_row["wteq"] != 0
-        ):
-            wteq_change = (
-                (today_row["wteq"] - yesterday_row["wteq"]) / yesterday_row["wteq"]
-            ) * 100
-            changes["wteq_percent"] = wteq_change
-            changes["wteq_direction"] = "up" if wteq_change >= 0 else "down"
-
-    return changes
+
+def get_data_fingerprint(latest_index, station_triplet):
+    """Cheap cache key for one station's data: station, elements, season, newest hour"""
+    newest = (
+        latest_index.filter(pl.col("stationTriplet") == station_triplet)
+        .get_column("date")
+        .max()
+    )
+    return station_triplet, tuple(ELEMENTS), SEASON_START, newest
+
+
+@st.cache_resource(max_entries=32)
+def get_station_view(_weather_data, fingerprint):
+    """Card values, comparisons and stats for one station, once per data version.
+
+    Keyed by get_data_fingerprint() only: the snapshot frames (leading
+    underscore) are never hashed, pickled or copied, so a rerun with
+    unchanged data is a dictionary lookup. Callers must not mutate the result.
+    """
+    station_triplet = fingerprint[0]
+    station_filter = pl.col("stationTriplet") == station_triplet
+    metrics, latest_date, staleness = get_latest_metrics(
+        _weather_data["latest"], station_triplet
+    )
+
+    # Compute all stats from the last 30 days of the daily rollup
+    recent_daily_df = _weather_data["index"]["daily"].last(
+        station_triplet, timedelta(days=30)
+    )
+    stats = recent_daily_df.select(
+        pl.col("SNWD_max").max().alias("max_snow"),
+        (
+            (pl.col("SNWD_mean") * pl.col("SNWD_count")).sum()
+            / pl.col("SNWD_count").sum()
+        ).alias("avg_snow"),
+        pl.col("TOBS_max").max().alias("max_temp"),
+        pl.col("TOBS_min").min().alias("min_temp"),
+    ).row(0, named=True)
+
+    return {
+        "metrics": metrics,
+        "latest_date": latest_date,
+        "staleness": staleness,
+        "changes": {
+            window: get_day_over_day_changes(
+                _weather_data, station_triplet, window=window
+            )
+            for window in COMPARISON_LABELS
+        },
+        "stats": stats,
+        "qc": _weather_data["qc"]
+        .filter(station_filter)
+        .select(
+            pl.col("elementCode").cast(pl.String).alias("Element"),
+            pl.col("hours").alias("Hours"),
+            pl.col("inserted").alias("Not reported"),
+            pl.col("spikes").alias("Spikes rejected"),
+            pl.col("filled").alias("Interpolated"),
+            pl.col("missing").alias("Still missing"),
+        ),
+    }
+
+
+def render_snow_depth_view(weather_data, fingerprint):
+    """Snow depth chart"""
+    st.markdown(
+        '<p class="chart-title">Snow Depth Over Time</p>',
+        unsafe_allow_html=True,
+    )
+
+    st.vega_lite_chart(
+        get_chart_spec(weather_data, fingerprint, "snow_depth"), width="stretch"
+    )
+
+
+def render_temperature_view(weather_data, fingerprint):
+    """Temperature chart"""
+    st.markdown(
+        '<p class="chart-title">Temperature Over Time</p>',
+        unsafe_allow_html=True,
+    )
+
+    st.vega_lite_chart(
+        get_chart_spec(weather_data, fingerprint, "temperature"),
+        width="stretch",
+    )
+
+
+def render_swe_view(weather_data, fingerprint):
+    """Snow water equivalent chart and explainer"""
+    st.markdown(
+        '<p class="chart-title">Snow Water Equivalent Over Time</p>',
+        unsafe_allow_html=True,
+    )
+
+    st.vega_lite_chart(
+        get_chart_spec(weather_data, fingerprint, "swe"), width="stretch"
+    )
+
+    st.markdown("---")
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    st.markdown(
+        """💧 **Understanding Snow Water Equivalent (SWE)**
+
+SWE measures the amount of water contained in the snowpack, expressed in inches. It represents how much liquid water you would have if all the snow melted. This is critical for water resource planning and helps predict runoff and water availability throughout the year.
+
+🎿 **For Skiers**: Higher SWE indicates a denser, more stable snowpack with greater water content. This often means longer-lasting snow conditions and better base stability. Rising SWE suggests fresh snow has fallen.
+
+📊 **SWE vs. Snow Depth**: Snow depth alone can be misleading—light, fluffy powder creates deep snow with low SWE, while heavy, wet snow creates less depth but higher SWE. Comparing both metrics shows the complete snowpack picture."""
+    )
+
+
+def render_density_view(weather_data, fingerprint):
+    """Bulk density chart, new-snow heatmap and explainer"""
+    st.markdown(
+        '<p class="chart-title">Snow Density Over Time (WTEQ / SNWD)</p>',
+        unsafe_allow_html=True,
+    )
+
+    st.vega_lite_chart(
+        get_chart_spec(weather_data, fingerprint, "density"), width="stretch"
+    )
+
+    st.markdown("---")
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # New-snow (layer) density heatmap - last HEATMAP_DAYS days
+    st.markdown(
+        f'<p class="chart-title">New Snow Layer Density (last {HEATMAP_DAYS} days)</p>',
+        unsafe_allow_html=True,
+    )
+
+    heatmap_spec = get_chart_spec(weather_data, fingerprint, "heatmap")
+
+    if heatmap_spec is not None:
+        st.vega_lite_chart(heatmap_spec, width="stretch")
+        st.markdown(
+            f'<p class="caption-text">Heatmap shows accumulation hours over the last {HEATMAP_DAYS} days. Darker blue indicates denser, heavier snow. Each cell represents one hour of active snowfall (≥ 0.5" accumulation).</p>',
+            unsafe_allow_html=True,
+        )
+    else:
+        st.info(f"No accumulation hours recorded in the last {HEATMAP_DAYS} days.")
+
+    st.markdown("---")
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    st.markdown(
+        f"""❄️ **Understanding Snow Density (kg/m³)**
+
+**Bulk Snowpack Density** (top chart) reflects the average density of the entire snowpack — old base layers, settled snow, and fresh snow combined. It tends to rise slowly throughout the season as the base compresses.
+
+**New Snow Layer Density** (heatmap) shows the density of only the snow that fell in each individual hour, making it a much better indicator of current skiing conditions. Each cell represents one hour of active snowfall (≥ {MIN_ACCUMULATION_INCHES}" per hour).
+
+| Condition | Range | Description |
+|-----------|-------|-------------|
+| 🎿 Fresh Powder | 10 - 50 | Lightly compacted, freshly fallen powder. Ideal skiing conditions. |
+| ⛷️ New & Settling | 50 - 100 | Recently fallen snow beginning to settle and compress. |
+| 💨 Wind-Affected | ~200 | Denser snow deposited or compacted by wind. |
+| 🧊 Heavy/Wet Snow | ≥ 300 | High-water-content snow — heavy to ski, great for base building. |"""
+    )
+
+
+def render_normals_view(weather_data, fingerprint):
+    """This season's snow depth and SWE against past seasons"""
+    snow_depth_spec = get_chart_spec(weather_data, fingerprint, "snow_depth_normals")
+    if snow_depth_spec is None:
+        st.info(
+            "No past seasons stored for this station yet. Run "
+            "`python snow_backfill.py` to download them."
+        )
+        return
+
+    st.markdown(
+        '<p class="chart-title">Snow Depth vs. Past Seasons</p>',
+        unsafe_allow_html=True,
+    )
+    st.vega_lite_chart(snow_depth_spec, width="stretch")
+
+    swe_spec = get_chart_spec(weather_data, fingerprint, "swe_normals")
+    if swe_spec is not None:
+        st.markdown(
+            '<p class="chart-title">Snow Water Equivalent vs. Past Seasons</p>',
+            unsafe_allow_html=True,
+        )
+        st.vega_lite_chart(swe_spec, width="stretch")
+
+    seasons = (
+        weather_data["normals"]
+        .filter(pl.col("stationTriplet") == fingerprint[0])
+        .get_column("seasons")
+        .max()
+    )
+    st.markdown(
+        f'<p class="caption-text">The shaded band spans the 10th to 90th percentile of the daily mean on each day of the water year over up to {seasons} past seasons; the dashed line is the median. The solid line is this season.</p>',
+        unsafe_allow_html=True,
+    )
+
+
+# Chart views, in selector order
+CHART_VIEWS = {
+    "Snow Depth": render_snow_depth_view,
+    "Temperature": render_temperature_view,
+    "Snow Water Equivalent": render_swe_view,
+    "Snow Density": render_density_view,
+    "vs. Past Seasons": render_normals_view,
+}
+
+
+@st.fragment
+def render_chart_views(weather_data, fingerprint):
+    """Render only the selected chart view.
+
+    Unlike st.tabs, which runs every tab body, only the chosen view prepares
+    data and specs. Switching views reruns just this fragment.
+    """
+    selected = st.radio(
+        "Chart",
+        list(CHART_VIEWS),
+        horizontal=True,
+        label_visibility="collapsed",
+    )
+    CHART_VIEWS[selected](weather_data, fingerprint)
 
 
 # Main app
@@ -602,12 +1246,27 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+# Station picker only appears when more than one station is configured
+station_triplet = STATION_TRIPLETS[0]
+if len(STATION_TRIPLETS) > 1:
+    station_triplet = st.selectbox(
+        "Station", STATION_TRIPLETS, format_func=get_station_label
+    )
+
 # Fetch and process data
 with st.spinner("Loading latest conditions..."):
     try:
-        weather_data_json = fetch_weather_data()
-        weather_df = process_weather_data(weather_data_json)
-        metrics, latest_date = get_latest_metrics(weather_df)
+        weather_data = get_weather_refresher().snapshot()
+        if len(STATION_TRIPLETS) > 1:
+            st.dataframe(
+                get_station_comparison(weather_data["latest"]), hide_index=True
+            )
+
+        fingerprint = get_data_fingerprint(weather_data["latest"], station_triplet)
+        view = get_station_view(weather_data, fingerprint)
+        metrics = view["metrics"]
+        latest_date = view["latest_date"]
+        staleness = view["staleness"]
 
         # Display last update time
         st.markdown(
@@ -615,8 +1274,15 @@ with st.spinner("Loading latest conditions..."):
             unsafe_allow_html=True,
         )
 
-        # Get day-over-day changes (average values)
-        day_changes = get_day_over_day_changes(weather_df)
+        # Get changes in average values over the chosen comparison window
+        comparison = st.radio(
+            "Compare with",
+            list(COMPARISON_LABELS),
+            format_func=COMPARISON_LABELS.get,
+            horizontal=True,
+            label_visibility="collapsed",
+        )
+        day_changes = view["changes"][comparison]
 
         # Current conditions metrics
         col1, col2, col3 = st.columns(3)
@@ -629,6 +1295,8 @@ with st.spinner("Loading latest conditions..."):
                     "Snow Depth",
                     change_percent=day_changes.get("snwd_percent"),
                     change_direction=day_changes.get("snwd_direction"),
+                    comparison_label=COMPARISON_LABELS[comparison],
+                    stale_for=staleness.get("SNWD"),
                 ),
                 unsafe_allow_html=True,
             )
@@ -641,6 +1309,8 @@ with st.spinner("Loading latest conditions..."):
                     "Temperature",
                     change_percent=day_changes.get("tobs_percent"),
                     change_direction=day_changes.get("tobs_direction"),
+                    comparison_label=COMPARISON_LABELS[comparison],
+                    stale_for=staleness.get("TOBS"),
                 ),
                 unsafe_allow_html=True,
             )
@@ -653,6 +1323,8 @@ with st.spinner("Loading latest conditions..."):
                     "Snow Water Equivalent",
                     change_percent=day_changes.get("wteq_percent"),
                     change_direction=day_changes.get("wteq_direction"),
+                    comparison_label=COMPARISON_LABELS[comparison],
+                    stale_for=staleness.get("WTEQ"),
                 ),
                 unsafe_allow_html=True,
             )
@@ -660,304 +1332,15 @@ with st.spinner("Loading latest conditions..."):
         st.markdown("<br>", unsafe_allow_html=True)
 
         # Charts section
-        tab1, tab2, tab3, tab4 = st.tabs(
-            ["Snow Depth", "Temperature", "Snow Water Equivalent", "Snow Density"]
-        )
-
-        with tab1:
-            st.markdown(
-                '<p class="chart-title">Snow Depth Over Time</p>',
-                unsafe_allow_html=True,
-            )
-
-            # Base chart with x-axis encoding
-            base = alt.Chart(weather_df).encode(
-                x=alt.X("date:T", title="", axis=create_axis(grid=False))
-            )
-
-            # Snow depth area chart
-            snow_area = base.mark_area(
-                color="lightblue", interpolate="step-after", line=True
-            ).encode(y=alt.Y("SNWD:Q", title="Snow Depth (Inches)", axis=create_axis()))
-
-            snow_depth_chart = configure_chart(snow_area)
-            st.altair_chart(snow_depth_chart)
-
-        with tab2:
-            st.markdown(
-                '<p class="chart-title">Temperature Over Time</p>',
-                unsafe_allow_html=True,
-            )
+        render_chart_views(weather_data, fingerprint)
 
-            # Temperature Chart
-            temp_line = (
-                alt.Chart(weather_df)
-                .mark_line(color="#f59e0b", size=2, point=False)
-                .encode(
-                    x=alt.X("date:T", title="", axis=create_axis(grid=False)),
-                    y=alt.Y("TOBS:Q", title="Temperature (°F)", axis=create_axis()),
-                    tooltip=["date:T", alt.Tooltip("TOBS:Q", format=".1f")],
-                    color=alt.value("#f59e0b"),
-                )
-            )
-
-            # Freezing point reference line
-            freezing_line = (
-                alt.Chart(pl.DataFrame({"freezing_point": [32]}))
-                .mark_rule(strokeDash=[5, 5], color="lightblue", size=2)
-                .encode(y="freezing_point:Q", color=alt.value("lightblue"))
-            )
-
-            # Legend layer
-            legend_data = pl.DataFrame(
-                {
-                    "legend": ["Observed Temperature", "Freezing Point (32°F)"],
-                    "value": [0, 0],
-                }
-            )
-            legend_layer = (
-                alt.Chart(legend_data)
-                .mark_point(opacity=0)
-                .encode(
-                    color=alt.Color(
-                        "legend:N",
-                        scale=alt.Scale(
-                            domain=["Observed Temperature", "Freezing Point (32°F)"],
-                            range=["#f59e0b", "lightblue"],
-                        ),
-                        legend=alt.Legend(
-                            title="Legend", titleFontSize=12, labelFontSize=11
-                        ),
-                    )
-                )
-            )
-
-            temp_chart = configure_chart(
-                temp_line + freezing_line + legend_layer,
-                legend=True,
-            )
-            st.altair_chart(temp_chart, use_container_width=True)
-
-        with tab3:
-            st.markdown(
-                '<p class="chart-title">Snow Water Equivalent Over Time</p>',
-                unsafe_allow_html=True,
-            )
-
-            # SWE Chart
-            swe_area = (
-                alt.Chart(weather_df)
-                .mark_area(
-                    color="#06b6d4", opacity=0.3, interpolate="step-after", line=True
-                )
-                .encode(
-                    x=alt.X("date:T", title="", axis=create_axis(grid=False)),
-                    y=alt.Y("WTEQ:Q", title="SWE (inches)", axis=create_axis()),
-                    tooltip=["date:T", alt.Tooltip("WTEQ:Q", format=".2f")],
-                )
-            )
-
-            swe_chart = configure_chart(swe_area)
-            st.altair_chart(swe_chart, use_container_width=True)
-
-            st.markdown("---")
-            st.markdown("<br>", unsafe_allow_html=True)
-
-            st.markdown(
-                """💧 **Understanding Snow Water Equivalent (SWE)**
-
-SWE measures the amount of water contained in the snowpack, expressed in inches. It represents how much liquid water you would have if all the snow melted. This is critical for water resource planning and helps predict runoff and water availability throughout the year.
-
-🎿 **For Skiers**: Higher SWE indicates a denser, more stable snowpack with greater water content. This often means longer-lasting snow conditions and better base stability. Rising SWE suggests fresh snow has fallen.
-
-📊 **SWE vs. Snow Depth**: Snow depth alone can be misleading—light, fluffy powder creates deep snow with low SWE, while heavy, wet snow creates less depth but higher SWE. Comparing both metrics shows the complete snowpack picture."""
-            )
-
-        with tab4:
-            # Filter to rows with valid bulk snow_density
-            valid_density_df = weather_df.filter(
-                (pl.col("WTEQ") > 0) & (pl.col("SNWD") > 0)
-            )
-            mean_density = valid_density_df.select(pl.col("snow_density").mean()).item()
-
-            st.markdown(
-                '<p class="chart-title">Snow Density Over Time (WTEQ / SNWD)</p>',
-                unsafe_allow_html=True,
-            )
-
-            # Base chart
-            base = alt.Chart(valid_density_df).encode(
-                x=alt.X("date:T", title="", axis=create_axis(grid=False))
-            )
-
-            # Snow density area
-            density_area = base.mark_area(interpolate="basis", opacity=0.6).encode(
-                y=alt.Y(
-                    "snow_density:Q",
-                    title="Snow Density (WTEQ / SNWD)",
-                    axis=create_axis(),
-                ),
-                color=alt.value("#efe6ff"),
-                tooltip=["date:T", alt.Tooltip("snow_density:Q", format=".3f")],
-            )
-
-            # 24-hour rolling mean
-            rolling_mean = (
-                base.transform_window(
-                    rolling_mean="mean(snow_density)",
-                    frame=[-23, 0],
-                    sort=[{"field": "date", "order": "ascending"}],
-                )
-                .mark_line(color="#7c3aed", size=2)
-                .encode(y=alt.Y("rolling_mean:Q"), color=alt.value("#7c3aed"))
-            )
-
-            # Overall mean reference line
-            mean_rule = (
-                alt.Chart(pl.DataFrame({"mean_density": [mean_density]}))
-                .mark_rule(color="#94a3b8", strokeDash=[4, 4], size=2)
-                .encode(y="mean_density:Q", color=alt.value("#94a3b8"))
-            )
-
-            # Legend layer
-            legend_data = pl.DataFrame(
-                {
-                    "legend": ["Snow Density", "24-Hour Rolling Mean", "Overall Mean"],
-                    "value": [0, 0, 0],
-                }
-            )
-            legend_layer = (
-                alt.Chart(legend_data)
-                .mark_point(opacity=0)
-                .encode(
-                    color=alt.Color(
-                        "legend:N",
-                        scale=alt.Scale(
-                            domain=[
-                                "Snow Density",
-                                "24-Hour Rolling Mean",
-                                "Overall Mean",
-                            ],
-                            range=["#efe6ff", "#7c3aed", "#94a3b8"],
-                        ),
-                        legend=alt.Legend(
-                            title="Legend", titleFontSize=12, labelFontSize=11
-                        ),
-                    )
-                )
-            )
-
-            density_chart = configure_chart(
-                density_area + rolling_mean + mean_rule + legend_layer,
-                height=420,
-                legend=True,
-            )
-            st.altair_chart(density_chart, use_container_width=True)
-
-            st.markdown("---")
-            st.markdown("<br>", unsafe_allow_html=True)
-
-            # New-snow (layer) density heatmap - last 120 days
-            st.markdown(
-                '<p class="chart-title">New Snow Layer Density (last 120 days)</p>',
-                unsafe_allow_html=True,
-            )
-
-            new_snow_df = weather_df.filter(pl.col("new_snow_density").is_not_null())
-
-            if new_snow_df.height > 0:
-                # Get date range for last 120 days
-                latest_date_hm = new_snow_df.select(pl.col("date").max()).item()
-                cutoff_date = latest_date_hm - timedelta(days=120)
-
-                # Filter to last 60 days
-                new_snow_60d = new_snow_df.filter(pl.col("date") >= cutoff_date)
-
-                if new_snow_60d.height > 0:
-                    # Extract day and hour for heatmap binning
-                    heatmap_data = new_snow_60d.with_columns(
-                        [
-                            pl.col("date").dt.strftime("%m-%d").alias("day"),
-                            pl.col("date").dt.hour().alias("hour"),
-                        ]
-                    ).select(["day", "hour", "new_snow_density"])
-
-                    # Create heatmap
-                    heatmap = (
-                        alt.Chart(heatmap_data)
-                        .mark_rect()
-                        .encode(
-                            x=alt.X(
-                                "day:O",
-                                title="Date",
-                                axis=create_axis(grid=False),
-                            ),
-                            y=alt.Y(
-                                "hour:O",
-                                title="Hour of Day",
-                                axis=create_axis(grid=False),
-                                sort="ascending",
-                            ),
-                            color=alt.Color(
-                                "new_snow_density:Q",
-                                scale=alt.Scale(
-                                    scheme="blues",
-                                    domain=[0, 150],
-                                ),
-                                title="Density (kg/m³)",
-                            ),
-                            tooltip=[
-                                alt.Tooltip("day:O", title="Date"),
-                                alt.Tooltip("hour:O", title="Hour"),
-                                alt.Tooltip(
-                                    "new_snow_density:Q",
-                                    title="New Snow Density",
-                                    format=".1f",
-                                ),
-                            ],
-                        )
-                    )
-
-                    heatmap_chart = configure_chart(heatmap, height=320)
-                    st.altair_chart(heatmap_chart, use_container_width=True)
-                    st.markdown(
-                        '<p class="caption-text">Heatmap shows accumulation hours over the last 120 days. Darker blue indicates denser, heavier snow. Each cell represents one hour of active snowfall (≥ 0.5" accumulation).</p>',
-                        unsafe_allow_html=True,
-                    )
-                else:
-                    st.info("No accumulation hours recorded in the last 120 days.")
-            else:
-                st.info("No accumulation hours recorded yet this season.")
-
-            st.markdown("---")
-            st.markdown("<br>", unsafe_allow_html=True)
-
-            st.markdown(
-                f"""❄️ **Understanding Snow Density (kg/m³)**
-
-**Bulk Snowpack Density** (top chart) reflects the average density of the entire snowpack — old base layers, settled snow, and fresh snow combined. It tends to rise slowly throughout the season as the base compresses.
-
-**New Snow Layer Density** (heatmap) shows the density of only the snow that fell in each individual hour, making it a much better indicator of current skiing conditions. Each cell represents one hour of active snowfall (≥ {MIN_ACCUMULATION_INCHES}" per hour).
-
-| Condition | Range | Description |
-|-----------|-------|-------------|
-| 🎿 Fresh Powder | 10 - 50 | Lightly compacted, freshly fallen powder. Ideal skiing conditions. |
-| ⛷️ New & Settling | 50 - 100 | Recently fallen snow beginning to settle and compress. |
-| 💨 Wind-Affected | ~200 | Denser snow deposited or compacted by wind. |
-| 🧊 Heavy/Wet Snow | ≥ 300 | High-water-content snow — heavy to ski, great for base building. |"""
-            )
+        st.markdown("<br>", unsafe_allow_html=True)
 
         # Statistics section
         st.markdown("### 📈 30-Day Statistics")
         col1, col2, col3, col4 = st.columns(4)
 
-        # Compute all stats in single batch operation
-        stats = weather_df.select(
-            pl.col("SNWD").max().alias("max_snow"),
-            pl.col("SNWD").mean().alias("avg_snow"),
-            pl.col("TOBS").max().alias("max_temp"),
-            pl.col("TOBS").min().alias("min_temp"),
-        ).row(0, named=True)
+        stats = view["stats"]
 
         # Modern stat cards with Tailwind-inspired styling
         stat_items = [
@@ -980,6 +1363,13 @@ SWE measures the amount of water contained in the snowpack, expressed in inches.
                     unsafe_allow_html=True,
                 )
 
+        with st.expander("Data quality this season"):
+            st.dataframe(view["qc"], hide_index=True)
+            st.markdown(
+                f'<p class="caption-text">Hourly readings further than a set threshold from the median of the surrounding {QC_MEDIAN_WINDOW} hours are rejected as spikes. Gaps of up to {QC_MAX_GAP_HOURS} hours are interpolated before densities are calculated; longer gaps stay empty.</p>',
+                unsafe_allow_html=True,
+            )
+
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         st.info(
@@ -989,6 +1379,6 @@ SWE measures the amount of water contained in the snowpack, expressed in inches.
 # Footer
 st.markdown("---")
 st.markdown(
-    '<p class="caption-text">🔗 Data source: USDA Natural Resources Conservation Service SNOTEL Network | Station: Palisades Tahoe (784:CA:SNTL)</p>',
+    f'<p class="caption-text">🔗 Data source: USDA Natural Resources Conservation Service SNOTEL Network | Station: {get_station_label(station_triplet)}</p>',
     unsafe_allow_html=True,
 )
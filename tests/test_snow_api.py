@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+import polars as pl
+import pytest
+
+from snow_api import ApiError, series_frame
+from snow_pipeline import TimeRangeIndex
+
+
+@pytest.fixture
+def snapshot():
+    dates = [datetime(2026, 1, 1) + timedelta(hours=hour) for hour in range(48)]
+    hourly = pl.DataFrame(
+        {"stationTriplet": "784:CA:SNTL", "date": dates, "SNWD": 50.0},
+        schema_overrides={"stationTriplet": pl.Categorical},
+    )
+    return {"index": {"hourly": TimeRangeIndex(hourly)}}
+
+
+def test_series_frame_slices_last_window(snapshot):
+    params = {"station": "784:CA:SNTL", "last": "3h", "columns": "date,SNWD,SNWD"}
+    rows = series_frame(snapshot, params, "hourly")
+    assert rows.columns == ["stationTriplet", "date", "SNWD"]
+    assert rows.height == 3
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"station": ""},
+        {"station": "784:CA:SNTL", "last": ""},
+        {"station": "784:CA:SNTL", "last": "99999999999d"},
+        {"station": "784:CA:SNTL", "last": "900000d"},
+        {"station": "784:CA:SNTL", "start": ""},
+        {"station": "784:CA:SNTL", "start": "2026-01-01T00:00:00+00:00"},
+        {"station": "784:CA:SNTL", "columns": "SNWD,,TOBS"},
+    ],
+)
+def test_series_frame_rejects_bad_parameters(snapshot, params):
+    with pytest.raises(ApiError) as error:
+        series_frame(snapshot, params, "hourly")
+    assert error.value.status == 400
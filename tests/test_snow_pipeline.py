@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from snow_pipeline import (
+    TimeRangeIndex,
+    build_heatmap_matrix,
+    build_latest_index,
+    process_weather_data,
+    update_heatmap_matrix,
+    update_latest_index,
+)
+from snow_store import OBSERVATION_SCHEMA, REFETCH_OVERLAP
+
+BEGIN = datetime(2025, 12, 1)
+
+
+def storm_observations(days, station_triplet="784:CA:SNTL"):
+    """Hourly readings with snowfall in the first six hours of every day"""
+    rows = []
+    snwd, wteq = 10.0, 2.0
+    for hour in range(days * 24):
+        if hour % 24 < 6:
+            snwd, wteq = snwd + 1.0, wteq + 0.1
+        date = BEGIN + timedelta(hours=hour)
+        rows += [
+            (station_triplet, "SNWD", date, snwd),
+            (station_triplet, "WTEQ", date, wteq),
+            (station_triplet, "TOBS", date, 20.0),
+        ]
+    return pl.DataFrame(rows, schema=OBSERVATION_SCHEMA, orient="row")
+
+
+def test_updates_catch_up_after_interrupted_refresh():
+    observations = storm_observations(30)
+    # A refresh stored observations through day 25 but died before writing
+    # its frames, which still end on day 10
+    processed_until = BEGIN + timedelta(days=10, hours=7)
+    stored_until = BEGIN + timedelta(days=25, hours=23)
+    old = observations.filter(pl.col("date") <= processed_until)
+    new = observations.filter(pl.col("date") <= stored_until)
+    since = stored_until - REFETCH_OVERLAP
+
+    old_matrix = build_heatmap_matrix(TimeRangeIndex(process_weather_data(old)))
+    new_index = TimeRangeIndex(process_weather_data(new))
+    assert update_heatmap_matrix(old_matrix, new_index, since).equals(
+        build_heatmap_matrix(new_index)
+    )
+
+    stalled = new.filter(
+        (pl.col("elementCode") != "TOBS")
+        | (pl.col("date") <= since - timedelta(days=1))
+    )
+    assert update_latest_index(build_latest_index(old), stalled, since).equals(
+        build_latest_index(stalled)
+    )
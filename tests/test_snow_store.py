@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from snow_store import (
+    OBSERVATION_SCHEMA,
+    REFETCH_OVERLAP,
+    delta_begin_date,
+    latest_observation_dates,
+)
+
+SEASON_START = "2025-10-01"
+
+
+def hourly_observations(ends):
+    """Hourly readings from the season start to each element's end date"""
+    begin = datetime.fromisoformat(SEASON_START)
+    rows = []
+    for element, end in ends.items():
+        hours = int((end - begin) / timedelta(hours=1)) + 1
+        rows += [
+            ("784:CA:SNTL", element, begin + timedelta(hours=hour), 1.0)
+            for hour in range(hours)
+        ]
+    return pl.DataFrame(rows, schema=OBSERVATION_SCHEMA, orient="row")
+
+
+def test_delta_begin_date_starts_at_season_when_empty():
+    empty = pl.DataFrame(schema=OBSERVATION_SCHEMA)
+    assert delta_begin_date(empty, SEASON_START) == datetime(2025, 10, 1)
+
+
+def test_delta_begin_date_catches_up_lagging_element():
+    newest = datetime(2026, 4, 18, 23)
+    df = hourly_observations(
+        {"SNWD": newest, "WTEQ": newest, "TOBS": newest - timedelta(hours=3)}
+    )
+    expected = newest - timedelta(hours=3) - REFETCH_OVERLAP
+    assert delta_begin_date(df, SEASON_START) == expected
+
+
+def test_delta_begin_date_ignores_element_that_stopped_reporting():
+    newest = datetime(2026, 4, 18, 23)
+    stopped = datetime(2026, 1, 8, 23)
+    df = hourly_observations({"SNWD": newest, "WTEQ": newest, "SNDN": stopped})
+    # Null readings after melt-out do not count as reports either
+    df = pl.concat(
+        [
+            df,
+            pl.DataFrame(
+                [("784:CA:SNTL", "SNDN", newest, None)],
+                schema=OBSERVATION_SCHEMA,
+                orient="row",
+            ),
+        ]
+    )
+
+    assert latest_observation_dates(df)["SNDN"] == stopped
+    assert delta_begin_date(df, SEASON_START) == newest - REFETCH_OVERLAP